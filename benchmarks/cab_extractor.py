@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - C&B Extractor Benchmark
+Runs the C&B HTML fallback extractor over multi-MB pathological pages
+(unterminated "auctions" values, deeply nested decoys, script bodies full
+of "</") and checks each finishes within a time bound. Also checks the
+real listings are still found behind many decoy "auctions" keys.
+
+Usage: python benchmarks/cab_extractor.py [--mb N] [--limit S]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scrapers import extract_cab_data_from_html  # noqa: E402
+
+LISTINGS = [{'title': f'{1990 + i} Acura Integra Type R', 'id': f'cab-{i}'} for i in range(50)]
+REAL_BLOB = 'window.__DATA__ = ' + json.dumps({'props': {'auctions': LISTINGS}}) + ';'
+
+
+def repeat_to(text, size):
+    return text * max(1, size // len(text))
+
+
+def pages(size):
+    """(name, html, expected listings) for each pathological page."""
+    # Every decoy starts an array that never closes
+    yield ('unterminated arrays',
+           repeat_to('"auctions": [{"title": "x"}, {"title": "y"}, ', size), [])
+
+    # Each decoy's value runs to the end of the script before failing
+    yield ('nested decoys',
+           '{"auctions": ' * 400 + '[' + repeat_to('1, ', size), [])
+
+    # Past the recursion limit
+    yield ('deep nesting', repeat_to('{"auctions": ', size), [])
+
+    # Lots of "</" the parser has to look past to find </script>
+    yield ('close tags in script',
+           repeat_to('s += "</div></span>" + "<\\/p>"; ', size) + REAL_BLOB, LISTINGS)
+
+    # Cheap decoys ahead of the real data
+    yield ('decoys then data', '"auctions": null, ' * 25 + REAL_BLOB, LISTINGS)
+    yield ('many decoys then data',
+           repeat_to('"auctions": {"count": 0}, ', size) + REAL_BLOB, LISTINGS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--mb', type=float, default=4)
+    parser.add_argument('--limit', type=float, default=2.0, help='Seconds allowed per page')
+    args = parser.parse_args()
+
+    failures = []
+    print(f'{"page":<24} {"size":>8} {"seconds":>8} {"listings":>9}')
+    for name, script, expected in pages(int(args.mb * 1024 * 1024)):
+        html = f'<html><head><script>{script}</script></head><body></body></html>'
+        start = time.perf_counter()
+        try:
+            items = extract_cab_data_from_html(html)
+        except Exception as e:
+            failures.append(f'{name}: raised {e!r}')
+            continue
+        seconds = time.perf_counter() - start
+        print(f'{name:<24} {len(html) / 1024 / 1024:>6.1f}MB {seconds:>8.3f} {len(items):>9}')
+
+        if seconds > args.limit:
+            failures.append(f'{name}: took {seconds:.2f}s, limit {args.limit}s')
+        if items != expected:
+            failures.append(f'{name}: found {len(items)} listings, expected {len(expected)}')
+
+    print()
+    print('\n'.join(f'FAIL {f}' for f in failures) or 'all checks passed')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
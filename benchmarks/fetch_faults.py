@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Fetch Fault Drill
+Runs the fetch layer against a local stand-in server that fails on purpose
+(5xx bursts, 429 with Retry-After, slow and hung responses, oversized
+bodies, a blocking firewall) and checks each behaviour and its timing.
+
+Usage: python benchmarks/fetch_faults.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fetch  # noqa: E402
+from fetch import CircuitBreaker, CircuitOpenError, Fetcher, HTTPStatusError, ResponseTooLarge  # noqa: E402
+
+hits = Counter()
+client_ports = set()
+
+
+class FaultyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, body=b'ok', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path
+        hits[path] += 1
+        client_ports.add(self.client_address[1])
+        count = hits[path]
+
+        if path == '/ok':
+            self.reply(200)
+        elif path == '/flaky':
+            self.reply(503 if count <= 2 else 200)
+        elif path == '/rate-limited':
+            self.reply(429, headers={'Retry-After': '1'}) if count == 1 else self.reply(200)
+        elif path == '/slow-first':
+            if count == 1:
+                time.sleep(3)
+            self.reply(200)
+        elif path == '/hang':
+            time.sleep(5)
+            self.reply(200)
+        elif path == '/big':
+            self.reply(200, b'x' * (2 * 1024 * 1024))
+        elif path == '/blocked':
+            self.reply(403)
+        elif path == '/missing':
+            self.reply(404)
+        elif path == '/redirect':
+            self.reply(302, b'', {'Location': '/ok'})
+        else:
+            self.reply(404)
+
+
+class FaultyServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass  # Clients hang up on purpose in several drills
+
+
+def check(name, func, expect, max_seconds):
+    start = time.perf_counter()
+    try:
+        outcome = func()
+    except Exception as e:
+        outcome = e
+    elapsed = time.perf_counter() - start
+    ok = expect(outcome) and elapsed <= max_seconds
+    label = type(outcome).__name__ if isinstance(outcome, Exception) else repr(outcome[:10])
+    print(f'{"PASS" if ok else "FAIL"}  {name:<42} {label:<20} {elapsed:6.2f}s (limit {max_seconds}s)')
+    return ok
+
+
+def main():
+    httpd = FaultyServer(('127.0.0.1', 0), FaultyHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{httpd.server_address[1]}'
+    breaker_dir = tempfile.mkdtemp()
+
+    def fetcher(**kwargs):
+        options = {'timeout': 2, 'retries': 3, 'backoff_base': 0.1, 'backoff_cap': 1.0,
+                   'breaker': CircuitBreaker('drill', directory=None)}
+        options.update(kwargs)
+        return Fetcher('drill', **options)
+
+    results = []
+    results.append(check('keep-alive reuse (5 GETs)',
+                         lambda: [fetcher().get(base + '/ok') for _ in range(5)][-1],
+                         lambda r: r == b'ok' and len(client_ports) == 1, 1))
+    results.append(check('503 burst then success (retry+backoff)',
+                         lambda: fetcher().get(base + '/flaky'),
+                         lambda r: r == b'ok' and hits['/flaky'] == 3, 2))
+    results.append(check('429 honours Retry-After',
+                         lambda: fetcher().get(base + '/rate-limited'),
+                         lambda r: r == b'ok', 2))
+    results.append(check('slow first response is hedged',
+                         lambda: fetcher(timeout=5, hedge_after=0.3).get(base + '/slow-first'),
+                         lambda r: r == b'ok', 1))
+    results.append(check('hung response times out',
+                         lambda: fetcher(timeout=0.5, retries=1).get(base + '/hang'),
+                         lambda r: isinstance(r, fetch.FetchError), 2))
+    results.append(check('hung hedged response is not retried',
+                         lambda: fetcher(timeout=1.5, hedge_after=0.5).get(base + '/hang'),
+                         lambda r: isinstance(r, fetch.FetchError) and hits['/hang'] == 4, 2.5))
+    results.append(check('retries stop at the total deadline',
+                         lambda: fetcher(timeout=0.5, total_timeout=1.2).get(base + '/hang'),
+                         lambda r: isinstance(r, fetch.FetchError), 1.5))
+    results.append(check('oversized body rejected',
+                         lambda: fetcher(max_bytes=1024 * 1024).get(base + '/big'),
+                         lambda r: isinstance(r, ResponseTooLarge), 1))
+    results.append(check('404 is not retried',
+                         lambda: fetcher().get(base + '/missing'),
+                         lambda r: isinstance(r, HTTPStatusError) and hits['/missing'] == 1, 0.5))
+    results.append(check('redirect followed',
+                         lambda: fetcher().get(base + '/redirect'),
+                         lambda r: r == b'ok', 0.5))
+
+    # Breaker: 403s open it, it survives a "new process", then skips instantly
+    breaker = CircuitBreaker('blocked', failure_threshold=3, cooldown=60, directory=breaker_dir)
+    blocked = Fetcher('blocked', timeout=1, retries=0, breaker=breaker)
+    for _ in range(3):
+        try:
+            blocked.get(base + '/blocked')
+        except HTTPStatusError:
+            pass
+    reloaded = CircuitBreaker('blocked', failure_threshold=3, cooldown=60, directory=breaker_dir)
+    results.append(check('open breaker persisted and skips source',
+                         lambda: Fetcher('blocked', breaker=reloaded).get(base + '/blocked'),
+                         lambda r: isinstance(r, CircuitOpenError) and hits['/blocked'] == 3, 0.05))
+
+    reloaded.opened_at -= 61  # Cooldown over: one trial request goes through
+    results.append(check('half-open trial failure reopens breaker',
+                         lambda: Fetcher('blocked', retries=0, breaker=reloaded).get(base + '/blocked'),
+                         lambda r: isinstance(r, HTTPStatusError) and reloaded.state == 'open', 0.5))
+
+    httpd.shutdown()
+    fetch.pool.clear()
+    print(f'{sum(results)}/{len(results)} passed')
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
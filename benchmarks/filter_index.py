@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Filter Index Benchmark
+Times filtered random-car and competition queries against a synthetic
+dataset, using the facet index and a full scan for comparison.
+
+Usage: python benchmarks/filter_index.py [--cars N] [--queries N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from car_index import CarIndex, car_facets, normalize_filters  # noqa: E402
+
+MAKES = [
+    ('Porsche', 'german'), ('BMW', 'german'), ('Ford', 'american'),
+    ('Chevrolet', 'american'), ('Toyota', 'japanese'), ('Mazda', 'japanese'),
+    ('Ferrari', 'italian'), ('Jaguar', 'british'), ('Volvo', 'swedish'),
+    ('Lotus', 'british'), ('Datsun', 'japanese'), ('Lancia', 'italian'),
+]
+
+QUERIES = [
+    {'make': 'Porsche'},
+    {'decade': '1980s'},
+    {'origin': 'japanese', 'decade': '1990s'},
+    {'make': 'Lancia', 'era': 'malaise', 'source': 'bat'},
+    {'origin': 'british', 'decade': '1960s', 'source': 'cab'},
+]
+
+
+def synthetic_cars(count):
+    rng = random.Random(42)
+    cars = []
+    for i in range(count):
+        make, origin = rng.choice(MAKES)
+        year = rng.randint(1935, 2024)
+        cars.append({
+            'id': f'syn-{i}',
+            'source': rng.choice(['Bring A Trailer', 'Cars And Bids']),
+            'title': f'{year} {make} Model {i % 500}',
+            'year': str(year),
+            'make': make,
+            'model': f'Model {i % 500}',
+            'origin': origin,
+            'imageUrl': '',
+            'auctionUrl': '',
+        })
+    return cars
+
+
+def scan(cars, filters):
+    """Baseline: check every car against the filters."""
+    wanted = dict(filters)
+    return [car for car in cars
+            if all(dict(car_facets(car)).get(facet) == key for facet, key in wanted.items())]
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1e6, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cars', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+
+    cars = synthetic_cars(args.cars)
+    start = time.perf_counter()
+    index = CarIndex(cars)
+    print(f'index build: {(time.perf_counter() - start) * 1000:.0f} ms for {len(cars):,} cars')
+    print()
+    print(f'{"filters":<55} {"matches":>8} {"random":>10} {"compete":>10} {"uncached":>10} {"scan":>10}')
+
+    for params in QUERIES:
+        filters = normalize_filters(params)
+        random_us, _ = timed(lambda: index.random_car(filters), args.queries)
+        compete_us, _ = timed(lambda: index.competition_cars(10, filters), args.queries)
+        uncached_us, matches = timed(lambda: index._query(filters), max(1, args.queries // 10))
+        scan_us, scanned = timed(lambda: scan(cars, filters), 1)
+        assert len(scanned) == len(matches)
+        label = ', '.join(f'{k}={v}' for k, v in params.items())
+        print(f'{label:<55} {len(matches):>8,} {random_us:>8.1f}us {compete_us:>8.1f}us '
+              f'{uncached_us:>8.1f}us {scan_us / 1000:>8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
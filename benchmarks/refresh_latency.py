@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Refresh Latency Benchmark
+Compares serving latency while a CPU-heavy refresh runs inside the web
+process versus through server.refresh_cache() with a streaming scrape
+worker (batches merged and indexed in the web process), and fails if the
+worker refresh pushes p99 over a bound.
+
+Usage: python benchmarks/refresh_latency.py [--seconds S] [--cars N] [--max-p99 MS]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import HTTPServer
+from urllib.request import urlopen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import server  # noqa: E402
+
+SYNTHETIC_SECONDS = float(os.environ.get('SYNTHETIC_SECONDS', 3))
+SYNTHETIC_CARS = int(os.environ.get('SYNTHETIC_CARS', 2000))
+
+
+def synthetic_cars():
+    """Stand-in scraper: parse titles in pure Python for SYNTHETIC_SECONDS,
+    yielding SYNTHETIC_CARS cars spread evenly over that time."""
+    import pipeline
+
+    start = time.monotonic()
+    i = 0
+    for n in range(SYNTHETIC_CARS):
+        due = start + SYNTHETIC_SECONDS * (n + 1) / SYNTHETIC_CARS
+        while True:
+            title = f'{1960 + i % 60} Porsche 911 Carrera {i} Coupe 5-Speed'
+            parsed = pipeline.parse_car_title(title)
+            pipeline.is_motorcycle(title, parsed['make'])
+            i += 1
+            if time.monotonic() >= due:
+                break
+        yield {'id': f'syn-{n}', 'source': 'Synthetic', 'title': title, 'origin': 'german',
+               'imageUrl': '', 'auctionUrl': '', **parsed}
+
+
+class QuietHandler(server.GameHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def measure(url, seconds=None, thread=None):
+    """Request url back to back for `seconds` (or while thread runs); return
+    latencies in ms."""
+    latencies = []
+    deadline = time.monotonic() + (seconds or 0)
+    while thread.is_alive() if thread else time.monotonic() < deadline:
+        start = time.perf_counter()
+        with urlopen(url) as response:
+            response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(label, latencies):
+    print(f'{label:<22} n={len(latencies):<6} p50={percentile(latencies, 50):7.2f} ms  '
+          f'p99={percentile(latencies, 99):7.2f} ms  max={max(latencies):7.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=SYNTHETIC_SECONDS)
+    parser.add_argument('--cars', type=int, default=SYNTHETIC_CARS)
+    # Rebuilding the indexes after every batch gives ~18 ms here, about the
+    # in-process refresh; on one core the worker's own CPU use adds a few ms
+    parser.add_argument('--max-p99', type=float, default=10.0, help='Worker refresh p99 bound (ms)')
+    args = parser.parse_args()
+    # Inherited by the spawned worker
+    os.environ['SYNTHETIC_SECONDS'] = str(args.seconds)
+    os.environ['SYNTHETIC_CARS'] = str(args.cars)
+
+    import scrape_worker
+
+    server.car_cache['sources'] = {'bring_a_trailer': [
+        {'id': f'bat-{i}', 'source': 'Bring A Trailer', 'title': '', 'year': '1990',
+         'make': 'Mazda', 'model': f'Model {i}', 'imageUrl': '', 'auctionUrl': ''}
+        for i in range(2000)
+    ]}
+    server.rebuild_index()
+
+    httpd = HTTPServer(('127.0.0.1', 0), QuietHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{httpd.server_address[1]}/api/random-car'
+
+    report('idle', measure(url, args.seconds))
+
+    # Old behaviour: the refresh shares the web process (and its GIL)
+    refresh = threading.Thread(target=lambda: list(synthetic_cars()))
+    refresh.start()
+    report('in-process refresh', measure(url, thread=refresh))
+    refresh.join()
+
+    # The real refresh: the worker parses, this process merges and indexes
+    scrape_worker.SOURCES = {'synthetic': 'refresh_latency:synthetic_cars'}
+    refresh = threading.Thread(target=server.refresh_cache)
+    refresh.start()
+    worker = measure(url, thread=refresh)
+    report('worker refresh', worker)
+    refresh.join()
+    httpd.shutdown()
+
+    failures = []
+    if len(server.car_cache['sources'].get('synthetic', [])) != args.cars:
+        failures.append(f"refresh published {len(server.car_cache['sources'].get('synthetic', []))} "
+                        f'of {args.cars} cars')
+    if percentile(worker, 99) > args.max_p99:
+        failures.append(f'worker refresh p99 {percentile(worker, 99):.2f} ms over {args.max_p99} ms')
+    print()
+    print('\n'.join(f'FAIL {f}' for f in failures) or 'all checks passed')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
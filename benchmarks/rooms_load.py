@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Rooms Load Test
+Runs a full multiplayer game with hundreds of simulated players on one
+room: every player holds an SSE stream open and answers each round.
+Reports broadcast delivery lag and how many times events were encoded.
+
+Usage: python benchmarks/rooms_load.py [--players N] [--rounds-seconds S]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from urllib.request import Request, urlopen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('ROOM_REVEAL_SECONDS', '1')
+
+import server  # noqa: E402
+import rooms  # noqa: E402
+
+
+class QuietHandler(server.GameHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def api(base, path, data=None):
+    body = json.dumps(data).encode('utf-8') if data is not None else b''
+    req = Request(base + path, data=body, method='POST' if data is not None else 'GET',
+                  headers={'Content-Type': 'application/json'})
+    with urlopen(req) as response:
+        return json.loads(response.read())
+
+
+async def player_stream(host, port, room_id, player_id, lags, events):
+    """Hold an SSE stream open and record delivery lag for every event."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f'GET /api/rooms/{room_id}/events?playerId={player_id} HTTP/1.1\r\n'
+                 f'Host: {host}\r\n\r\n'.encode())
+    await writer.drain()
+    await reader.readuntil(b'\r\n\r\n')
+    event = None
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        line = line.decode().rstrip('\n')
+        if line.startswith('event: '):
+            event = line[7:]
+        elif line.startswith('data: '):
+            data = json.loads(line[6:])
+            if 'sentAt' in data:
+                lags.append(time.time() * 1000 - data['sentAt'])
+            events[event] = events.get(event, 0) + 1
+            if event == 'finished':
+                break
+    writer.close()
+
+
+def answer_all(base, room_id, player_ids, stop):
+    """Answer every round for every player as rounds begin."""
+    answered = set()
+    while not stop.is_set():
+        snapshot = api(base, f'/api/rooms/{room_id}')
+        if snapshot['state'] == 'finished':
+            return
+        if snapshot['state'] == 'playing' and snapshot['round'] not in answered:
+            answered.add(snapshot['round'])
+            car_id = snapshot['car']['id']
+            for player_id in player_ids:
+                try:
+                    api(base, f'/api/rooms/{room_id}/answer', {
+                        'playerId': player_id, 'carId': car_id,
+                        'year': '1990', 'make': 'Mazda', 'model': 'Model'})
+                except OSError:
+                    break  # Round ended early once everyone answered
+        time.sleep(0.05)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args):
+    server.car_cache['sources']['bring_a_trailer'] = [
+        {'id': f'bat-{i}', 'source': 'Bring A Trailer', 'title': f'1990 Mazda Model {i}',
+         'year': '1990', 'make': 'Mazda', 'model': f'Model {i}', 'imageUrl': '', 'auctionUrl': ''}
+        for i in range(200)
+    ]
+    server.rebuild_index()
+
+    httpd = server.GameServer(('127.0.0.1', 0), QuietHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    host, port = httpd.server_address
+    base = f'http://{host}:{port}'
+
+    room = api(base, '/api/rooms', {'roundSeconds': args.round_seconds})
+    room_id = room['roomId']
+    player_ids = [api(base, f'/api/rooms/{room_id}/join', {'name': f'p{i}'})['playerId']
+                  for i in range(args.players)]
+
+    lags, events = [], {}
+    streams = [asyncio.create_task(player_stream(host, port, room_id, pid, lags, events))
+               for pid in player_ids]
+    while api(base, f'/api/rooms/{room_id}')['connected'] < args.players:
+        await asyncio.sleep(0.1)  # Let every stream attach
+
+    start = time.perf_counter()
+    encoded_before = server.get_room_hub().encoded_broadcasts
+    api(base, f'/api/rooms/{room_id}/start', {})
+    stop = threading.Event()
+    answering = threading.Thread(target=answer_all, args=(base, room_id, player_ids, stop))
+    answering.start()
+    await asyncio.gather(*streams)
+    stop.set()
+    answering.join()
+    elapsed = time.perf_counter() - start
+
+    encoded = server.get_room_hub().encoded_broadcasts - encoded_before
+    delivered = sum(events.values())
+    print(f'players: {args.players}, game time: {elapsed:.1f}s')
+    print(f'events delivered: {delivered:,} {dict(sorted(events.items()))}')
+    print(f'broadcasts encoded: {encoded} (once per broadcast, not per client)')
+    print(f'delivery lag: p50={percentile(lags, 50):.1f} ms  p99={percentile(lags, 99):.1f} ms  '
+          f'max={max(lags):.1f} ms')
+    print(f'peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB')
+    httpd.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=300)
+    parser.add_argument('--round-seconds', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Source Pipeline Benchmark
+Scrapes two stand-in auction sites (plugins defined below, served from a
+local server with slow pages) through the scrape workers, and reports when
+the first cars were published versus when the refresh finished, plus each
+stage's counters. Checks dedupe, the motorcycle filter and page tags.
+
+Usage: python benchmarks/source_pipeline.py [--pages N] [--page-delay S]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pipeline import Page, Source  # noqa: E402
+
+LISTINGS_PER_PAGE = 50
+MAKES = ['Porsche', 'BMW', 'Mazda', 'Ford', 'Lancia', 'Ducati']
+
+
+class AuctionPageHandler(BaseHTTPRequestHandler):
+    """GET /<site>/<page> -> JSON listings, after a delay."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        site, page = self.path.strip('/').split('/')
+        page = int(page)
+        time.sleep(float(os.environ['PIPELINE_PAGE_DELAY']))
+
+        listings = []
+        for i in range(LISTINGS_PER_PAGE):
+            # Pages overlap by half, so every other listing is a repeat
+            n = page * LISTINGS_PER_PAGE // 2 + i
+            make = MAKES[n % len(MAKES)]
+            listings.append({
+                'ref': f'{site}-{n}',
+                'name': f'{1960 + n % 60} {make} Model {n % 40}',
+                'photo': f'https://example.com/{site}/{n}.jpg',
+            })
+        body = json.dumps({'results': listings}).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class LocalAuctions(Source):
+    """A third site is only this: pages, extract and parse."""
+
+    name = 'local_auctions'
+    label = 'Local Auctions'
+    fetch_options = {'timeout': 10}
+
+    def pages(self, stats):
+        base = os.environ['PIPELINE_BASE_URL']
+        for page in range(int(os.environ['PIPELINE_PAGES'])):
+            # The last page is an "italian cars" listing
+            last = page == int(os.environ['PIPELINE_PAGES']) - 1
+            yield Page(f'{base}/{self.name}/{page}', tags={'origin': 'italian'} if last else None)
+
+    def extract(self, page, body):
+        return json.loads(body)['results']
+
+    def parse(self, item):
+        return {
+            'id': item['ref'],
+            'title': item['name'],
+            'imageUrl': item['photo'],
+            'auctionUrl': f'https://example.com/{item["ref"]}',
+        }
+
+
+class MirrorAuctions(LocalAuctions):
+    name = 'mirror_auctions'
+    label = 'Mirror Auctions'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=8)
+    parser.add_argument('--page-delay', type=float, default=0.5)
+    args = parser.parse_args()
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), AuctionPageHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    # Inherited by the spawned workers
+    os.environ['PIPELINE_BASE_URL'] = f'http://127.0.0.1:{httpd.server_address[1]}'
+    os.environ['PIPELINE_PAGES'] = str(args.pages)
+    os.environ['PIPELINE_PAGE_DELAY'] = str(args.page_delay)
+    os.environ['FETCH_BREAKER_DIR'] = tempfile.mkdtemp()
+
+    import scrape_worker
+
+    sources = {
+        'local_auctions': 'source_pipeline:LocalAuctions',
+        'mirror_auctions': 'source_pipeline:MirrorAuctions',
+    }
+    batches = []
+    stats = {}
+    start = time.monotonic()
+    results = scrape_worker.scrape_sources(
+        sources,
+        on_batch=lambda source, cars: batches.append((time.monotonic() - start, source, len(cars))),
+        on_stats=stats.__setitem__,
+    )
+    total_seconds = time.monotonic() - start
+    httpd.shutdown()
+
+    print(f'{len(sources)} sources x {args.pages} pages, {args.page_delay}s per page')
+    print(f'first cars published: {batches[0][0]:.2f}s')
+    print(f'refresh finished:     {total_seconds:.2f}s '
+          f'(one source alone fetches for {args.pages * args.page_delay:.1f}s)')
+    print()
+    print(f'{"at":>7}  {"source":<16} {"cars":>5}')
+    for at, source, count in batches:
+        print(f'{at:>6.2f}s  {source:<16} {count:>5}')
+
+    print()
+    print(f'{"source":<16} {"stage":<8} {"in":>6} {"out":>6} {"seconds":>9} {"per second":>11}')
+    for source, run in stats.items():
+        for stage, counts in run['stages'].items():
+            rate = f"{counts['perSecond']:,.0f}" if counts['perSecond'] else '-'
+            print(f'{source:<16} {stage:<8} {counts["in"]:>6} {counts["out"]:>6} '
+                  f'{counts["seconds"]:>9.4f} {rate:>11}')
+
+    # Self-checks
+    failures = []
+    for source, cars in results.items():
+        ids = [car['id'] for car in cars]
+        expected = (args.pages + 1) * LISTINGS_PER_PAGE // 2
+        motorcycles = expected // len(MAKES) + 1
+        if len(ids) != len(set(ids)):
+            failures.append(f'{source}: duplicate ids')
+        if any(car['make'] == 'Ducati' for car in cars):
+            failures.append(f'{source}: motorcycle got through')
+        if not expected - motorcycles <= len(cars) <= expected:
+            failures.append(f'{source}: {len(cars)} cars, expected about {expected - expected // len(MAKES)}')
+        # Cars first seen on earlier pages pick up the last page's tag
+        repeated = {f'{source}-{n}' for n in range((args.pages - 1) * LISTINGS_PER_PAGE // 2,
+                                                      args.pages * LISTINGS_PER_PAGE // 2)}
+        if any(car['origin'] != 'italian' for car in cars if car['id'] in repeated):
+            failures.append(f'{source}: page tag not applied to repeats')
+    if len(results) != len(sources):
+        failures.append(f'only {sorted(results)} finished')
+    if batches[0][0] > total_seconds / 2:
+        failures.append('first cars were not published early')
+
+    print()
+    print('\n'.join(f'FAIL {f}' for f in failures) or 'all checks passed')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Startup Benchmark
+Measures server import cost with -X importtime and time-to-first-byte
+from process spawn, and fails if the scraping stack (or the rooms event
+loop) leaks into startup.
+
+Usage: python benchmarks/startup.py [--runs N]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.request import urlopen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only load when a scrape, profile or room needs them
+HEAVY_MODULES = ('scrapers', 'playwright', 'html.parser', 'cProfile', 'pstats',
+                 'rooms', 'asyncio')
+
+
+def measure_imports():
+    """Import server with -X importtime and return (total_us, {module: cumulative_us})."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import server'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative_us)
+    return modules.get('server', 0), modules
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def measure_ttfb(timeout=10.0):
+    """Spawn server.py and time until /api/status returns its first byte."""
+    port = free_port()
+    env = {**os.environ, 'PORT': str(port)}
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, 'server.py'], cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urlopen(f'http://127.0.0.1:{port}/api/status', timeout=1) as response:
+                    response.read(1)
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError(f'Server did not answer within {timeout}s')
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    total_us, modules = measure_imports()
+    print(f'import server: {total_us / 1000:.1f} ms cumulative')
+    for name, us in sorted(modules.items(), key=lambda kv: -kv[1])[:10]:
+        print(f'  {us / 1000:8.1f} ms  {name}')
+
+    leaked = [m for m in HEAVY_MODULES if m in modules]
+
+    ttfbs = [measure_ttfb() for _ in range(args.runs)]
+    print(f'time to first byte: median {statistics.median(ttfbs) * 1000:.1f} ms, '
+          f'max {max(ttfbs) * 1000:.1f} ms over {args.runs} runs')
+
+    if leaked:
+        print(f'FAIL: serving path imports {", ".join(leaked)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
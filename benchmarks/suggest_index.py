@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Typeahead Benchmark
+Replays keystroke-by-keystroke make/model queries against a synthetic
+dataset and times the prefix index cold (uncached) and hot (LRU), with a
+linear scan over every name for comparison.
+
+Usage: python benchmarks/suggest_index.py [--cars N] [--repeat N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from car_index import facet_key  # noqa: E402
+from makes import KNOWN_MAKES  # noqa: E402
+from suggest import DEFAULT_LIMIT, SuggestIndex  # noqa: E402
+
+WORDS = ['Carrera', 'Turbo', 'Coupe', 'Roadster', 'GT', 'Spider', 'Wagon', 'Sport',
+         'Targa', 'Cabriolet', 'Sedan', 'Limited', 'Supercharged', 'Convertible']
+
+# (field, what the player types, make already entered)
+TYPED = [
+    ('make', 'Porsche', ''),
+    ('make', 'mercedes', ''),
+    ('make', 'alfa romeo', ''),
+    ('model', '911 Carrera', 'Porsche'),
+    ('model', 'carrera', ''),
+    ('model', 'Model 42', ''),
+    ('model', 'turbo', 'Toyota'),
+]
+
+
+def synthetic_cars(count):
+    rng = random.Random(42)
+    cars = []
+    for i in range(count):
+        make = rng.choice(KNOWN_MAKES[:40])
+        model = f'Model {rng.randint(1, 4000)} {rng.choice(WORDS)}'
+        if make == 'Porsche' and i % 3 == 0:
+            model = f'911 {rng.choice(WORDS)}'
+        cars.append({'id': f'syn-{i}', 'make': make, 'model': model})
+    return cars
+
+
+def scan(counts, prefix, limit):
+    """Baseline: check every name's words against the prefix."""
+    matches = [name for name in counts
+               if any(facet_key(' '.join(name.split()[i:])).startswith(prefix)
+                      for i in range(len(name.split())))]
+    return sorted(matches, key=lambda name: (-counts[name], name))[:limit]
+
+
+def keystrokes():
+    """Every prefix of every typed query, in typing order."""
+    for field, text, make in TYPED:
+        for end in range(1, len(text) + 1):
+            yield field, text[:end], make
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cars', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    cars = synthetic_cars(args.cars)
+    start = time.perf_counter()
+    index = SuggestIndex(cars, KNOWN_MAKES)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f'index build: {build_ms:.0f} ms for {len(cars):,} cars, '
+          f'{len(index.makes.counts)} makes, {len(index.models.counts):,} models')
+
+    queries = list(keystrokes())
+
+    # Sanity check against the scan before timing anything
+    for field, text, make in queries:
+        if field == 'model' and not make:
+            got = [s['value'] for s in index._suggest(field, text)]
+            assert got == scan(index.models.counts, facet_key(text), DEFAULT_LIMIT), text
+
+    cold = []
+    for _ in range(args.repeat):
+        for query in queries:
+            start = time.perf_counter()
+            index._suggest(*query)
+            cold.append(time.perf_counter() - start)
+
+    hot = []
+    for _ in range(args.repeat):
+        for query in queries:
+            start = time.perf_counter()
+            index.suggest(*query)
+            hot.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for field, text, make in queries:
+        if field == 'model':
+            scan(index.models.counts, facet_key(text), DEFAULT_LIMIT)
+    scan_us = (time.perf_counter() - start) / sum(1 for q in queries if q[0] == 'model') * 1e6
+
+    print(f'{len(queries)} keystrokes x {args.repeat}')
+    print()
+    print(f'{"":<10} {"p50":>10} {"p99":>10} {"max":>10}')
+    for label, samples in (('uncached', cold), ('cached', hot)):
+        samples.sort()
+        p50 = samples[len(samples) // 2] * 1e6
+        p99 = samples[int(len(samples) * 0.99)] * 1e6
+        print(f'{label:<10} {p50:>8.1f}us {p99:>8.1f}us {samples[-1] * 1e6:>8.1f}us')
+    print(f'{"scan":<10} {scan_us / 1000:>8.1f}ms (mean per model keystroke)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Car Index
+Facet indexes over the cached cars, rebuilt on every refresh.
+
+Each facet value maps to a sorted array of positions into the car list (plus
+a frozenset for membership tests). Single-facet queries are a dict lookup;
+multi-facet queries intersect the sets in C, smallest first, and hot
+combinations are cached per index.
+"""
+
+import random
+import re
+from array import array
+from functools import lru_cache
+
+# Filter names accepted by the API, in the order they are applied
+FACETS = ('era', 'decade', 'make', 'origin', 'source')
+
+# Short names accepted for the source filter
+SOURCE_ALIASES = {
+    'bat': 'bringatrailer',
+    'cab': 'carsandbids',
+}
+
+# Era buckets: (name, first year, last year)
+ERAS = (
+    ('prewar', 0, 1945),
+    ('classic', 1946, 1972),
+    ('malaise', 1973, 1983),
+    ('modernclassic', 1984, 1999),
+    ('modern', 2000, 9999),
+)
+
+
+@lru_cache(maxsize=4096)
+def facet_key(value):
+    """Normalize a facet value: lowercase alphanumerics only."""
+    return re.sub(r'[^a-z0-9]', '', str(value).lower())
+
+
+def era_for_year(year):
+    """Get the era bucket for a model year."""
+    for name, first, last in ERAS:
+        if first <= year <= last:
+            return name
+    return None
+
+
+def car_facets(car):
+    """Yield (facet, key) pairs for a car."""
+    try:
+        year = int(car['year'])
+    except (KeyError, ValueError, TypeError):
+        year = None
+
+    if year is not None:
+        yield 'era', era_for_year(year)
+        yield 'decade', f'{year // 10 * 10}s'
+    if car.get('make'):
+        yield 'make', facet_key(car['make'])
+    if car.get('origin'):
+        yield 'origin', facet_key(car['origin'])
+    if car.get('source'):
+        yield 'source', facet_key(car['source'])
+
+
+def normalize_filters(params):
+    """Turn query parameters into a tuple of (facet, key) filters in FACETS order.
+
+    Args:
+        params: Mapping of facet name -> value (as from parse_qs or a dict)
+    """
+    filters = []
+    for facet in FACETS:
+        value = params.get(facet)
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if not value:
+            continue
+
+        key = facet_key(value)
+        if facet == 'decade':
+            # Accept 1980, 1980s, 80s
+            digits = key.rstrip('s')
+            if len(digits) == 2:
+                digits = ('19' if digits >= '30' else '20') + digits
+            key = f'{digits}s'
+        elif facet == 'source':
+            key = SOURCE_ALIASES.get(key, key)
+        filters.append((facet, key))
+    return tuple(filters)
+
+
+class CarIndex:
+    """Id lookup and facet indexes over one snapshot of the car list."""
+
+    def __init__(self, cars):
+        self.cars = cars
+        self.by_id = {}
+        self.facets = {facet: {} for facet in FACETS}
+
+        for pos, car in enumerate(cars):
+            self.by_id[car['id']] = car
+            for facet, key in car_facets(car):
+                if key is not None:
+                    self.facets[facet].setdefault(key, array('I')).append(pos)
+
+        # Positions are appended in order, so every array is already sorted
+        self.members = {
+            facet: {key: frozenset(positions) for key, positions in values.items()}
+            for facet, values in self.facets.items()
+        }
+        self.all_positions = range(len(cars))
+        self.query = lru_cache(maxsize=256)(self._query)
+
+    def __len__(self):
+        return len(self.cars)
+
+    def _query(self, filters):
+        """Positions of cars matching every filter (sorted)."""
+        if not filters:
+            return self.all_positions
+
+        lists = []
+        for facet, key in filters:
+            positions = self.facets[facet].get(key)
+            if positions is None:
+                return ()
+            lists.append((len(positions), facet, key, positions))
+
+        lists.sort(key=lambda entry: entry[0])
+        _, facet, key, smallest = lists[0]
+        if len(lists) == 1:
+            return smallest
+
+        matches = self.members[facet][key]
+        for _, facet, key, _ in lists[1:]:
+            matches = matches & self.members[facet][key]
+        return array('I', sorted(matches))
+
+    def random_car(self, filters=(), attempts=16):
+        """Get a random car matching the filters, or None."""
+        if len(filters) > 1:
+            # Draw from the smallest facet and check the rest; only build the
+            # full intersection when matches are too sparse to hit quickly
+            lists = sorted(((self.facets[facet].get(key, ()), facet, key) for facet, key in filters),
+                           key=lambda entry: len(entry[0]))
+            smallest = lists[0][0]
+            if not smallest:
+                return None
+            others = [self.members[facet][key] for _, facet, key in lists[1:]]
+            for _ in range(attempts):
+                pos = random.choice(smallest)
+                if all(pos in other for other in others):
+                    return self.cars[pos]
+
+        positions = self.query(filters)
+        if not positions:
+            return None
+        return self.cars[random.choice(positions)]
+
+    def competition_cars(self, count=10, filters=()):
+        """Get up to `count` matching cars with no duplicate make+model."""
+        positions = self.query(filters)
+        if len(positions) <= count:
+            return [self.cars[pos] for pos in positions]
+
+        # Sample a few times the count up front; only fall back to a full
+        # shuffle when the pool is dominated by a handful of models
+        selected = []
+        used_make_models = set()
+        sample_size = min(len(positions), count * 4)
+        for size in (sample_size, len(positions)):
+            for pos in random.sample(positions, size):
+                car = self.cars[pos]
+                key = f"{car['make'].lower()}-{car['model'].lower()}"
+                if key not in used_make_models:
+                    used_make_models.add(key)
+                    selected.append(car)
+                    if len(selected) >= count:
+                        return selected
+        return selected
+
+    def facet_counts(self):
+        """Available filter values and how many cars each has."""
+        return {facet: {key: len(positions) for key, positions in sorted(values.items())}
+                for facet, values in self.facets.items()}
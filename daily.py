@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Daily Challenge
+One shared set of cars per (UTC) day.
+
+The set is picked once per day with a date-seeded shuffle and written to
+disk. The first process to write a day's file wins, so restarts and extra
+workers all serve the same cars. The public payload is encoded once per day
+and served with a strong ETag; answers stay on the server for scoring.
+"""
+
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+DAILY_DIR = os.environ.get(
+    'DAILY_CHALLENGE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+)
+DAILY_CAR_COUNT = 10
+MAX_SCORE_PER_CAR = 110
+
+# How long peek() trusts "no set saved today" before looking on disk again
+# (another process may have created it since)
+PEEK_RECHECK_SECONDS = 30
+
+
+def today():
+    """Current challenge date (UTC)."""
+    return datetime.now(timezone.utc).date()
+
+
+def seconds_until_tomorrow():
+    now = datetime.now(timezone.utc)
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), timezone.utc)
+    return max(1, int((tomorrow - now).total_seconds()))
+
+
+def pick_daily_cars(cars, date, count=DAILY_CAR_COUNT):
+    """Pick `count` unique make+model cars, the same for the same date and pool."""
+    seed = int.from_bytes(hashlib.sha256(f'daily-{date.isoformat()}'.encode()).digest()[:8], 'big')
+    rng = random.Random(seed)
+
+    # Sort first so scrape order doesn't change the pick
+    shuffled = sorted(cars, key=lambda car: car['id'])
+    rng.shuffle(shuffled)
+
+    selected = []
+    used_make_models = set()
+    for car in shuffled:
+        key = f"{car['make'].lower()}-{car['model'].lower()}"
+        if key not in used_make_models:
+            used_make_models.add(key)
+            selected.append(car)
+            if len(selected) >= count:
+                break
+    return selected
+
+
+class DailyChallenge:
+    """Today's challenge: cars, pre-encoded payload and ETag."""
+
+    def __init__(self, date, cars):
+        self.date = date
+        self.cars = cars
+        self.by_id = {car['id']: car for car in cars}
+        self.body = json.dumps({
+            'date': date.isoformat(),
+            'cars': [{'id': c['id'], 'imageUrl': c['imageUrl'], 'source': c['source']} for c in cars],
+        }).encode('utf-8')
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+    def summarize(self, answers, score):
+        """Score a full set of answers and build a shareable result.
+
+        Per-car results say which parts were right but never the answer.
+
+        Args:
+            answers: List of {carId, year, make, model} dicts
+            score: Callable (car, year, make, model) -> check-answer dict
+        """
+        results = []
+        answered = {}
+        for answer in answers:
+            car_id = answer.get('carId')
+            if isinstance(car_id, str) and car_id in self.by_id and car_id not in answered:
+                answered[car_id] = answer
+
+        for car in self.cars:
+            # A car with no answer is scored as blank guesses, i.e. 0
+            answer = answered.get(car['id'], {})
+            result = score(car, answer.get('year', ''), answer.get('make', ''), answer.get('model', ''))
+            # Results can be submitted any number of times, so they must
+            # not reveal the cars (or one call gets a perfect score)
+            result.pop('correctAnswer', None)
+            result['carId'] = car['id']
+            results.append(result)
+
+        total = sum(r['score'] for r in results)
+        max_score = MAX_SCORE_PER_CAR * len(self.cars)
+        perfect = sum(1 for r in results if r['score'] == MAX_SCORE_PER_CAR)
+        return {
+            'date': self.date.isoformat(),
+            'totalScore': total,
+            'maxScore': max_score,
+            'perfectCount': perfect,
+            'scores': [r['score'] for r in results],
+            'summary': f'Car Guess Daily {self.date.isoformat()}: {total}/{max_score} ({perfect} perfect)',
+            'results': results,
+        }
+
+
+class DailyChallengeStore:
+    """Loads or creates each day's challenge, once per process per day."""
+
+    def __init__(self, get_cars, directory=DAILY_DIR):
+        self.get_cars = get_cars
+        self.directory = directory
+        self.current = None
+        self.missing_since = None  # (date, monotonic time) of peek()'s last miss
+        self.lock = threading.Lock()
+
+    def path_for(self, date):
+        return os.path.join(self.directory, f'daily-{date.isoformat()}.json')
+
+    def get(self):
+        """Today's challenge, or None if there aren't enough cars yet."""
+        date = today()
+        current = self.current
+        if current is not None and current.date == date:
+            return current
+
+        with self.lock:
+            if self.current is None or self.current.date != date:
+                cars = self.load(date) or self.create(date)
+                self.current = DailyChallenge(date, cars) if cars else None
+            return self.current
+
+    def load(self, date):
+        try:
+            with open(self.path_for(date), encoding='utf-8') as f:
+                return json.load(f)['cars']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def create(self, date):
+        cars = pick_daily_cars(self.get_cars(), date)
+        if len(cars) < DAILY_CAR_COUNT:
+            return None
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError as e:
+            # Read-only or missing data dir: serve this process's pick unsaved
+            print(f'  Could not save daily challenge: {e}')
+            return cars
+
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'date': date.isoformat(), 'cars': cars}, f)
+            try:
+                # link() fails if another process already published today's set
+                os.link(tmp_path, self.path_for(date))
+            except FileExistsError:
+                return self.load(date) or cars
+            except OSError:
+                # No hard links on this filesystem; last writer wins instead
+                os.replace(tmp_path, self.path_for(date))
+        except OSError as e:
+            print(f'  Could not save daily challenge: {e}')
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        return cars
+
+    def peek(self):
+        """Today's challenge if any process has made it, else None (never creates)."""
+        date = today()
+        current = self.current
+        if current is not None and current.date == date:
+            return current
+
+        missing = self.missing_since
+        if missing and missing[0] == date and time.monotonic() - missing[1] < PEEK_RECHECK_SECONDS:
+            return None
+
+        cars = self.load(date)
+        if not cars:
+            self.missing_since = (date, time.monotonic())
+            return None
+        with self.lock:
+            if self.current is None or self.current.date != date:
+                self.current = DailyChallenge(date, cars)
+            return self.current
+
+    def is_daily_car(self, car_id):
+        """Whether a car is in today's challenge (scored only as a full set)."""
+        current = self.peek()
+        return current is not None and car_id in current.by_id
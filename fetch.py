@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Fetch Layer
+Shared HTTP fetching for the scrapers.
+
+- Keep-alive connections pooled per host
+- Retries with exponential backoff and full jitter for timeouts, connection
+  errors, 429 and 5xx (honouring Retry-After)
+- Hedged GETs: if the first attempt is slow, a second one races it
+- A total deadline per GET, covering every retry and hedge
+- A circuit breaker per source, persisted to disk so a blocked site is
+  skipped across refreshes (scrape workers are fresh processes) until its
+  cooldown expires
+- A hard cap on response size
+"""
+
+import http.client
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urljoin, urlsplit
+
+BREAKER_DIR = os.environ.get(
+    'FETCH_BREAKER_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+)
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+MAX_REDIRECTS = 5
+MAX_IDLE_PER_HOST = 4
+
+# Status codes worth retrying, and those that count against a source's breaker
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BREAKER_STATUSES = RETRY_STATUSES | {403}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+# Errors from a kept-alive connection the server already closed
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class FetchError(Exception):
+    """A fetch that failed after any retries."""
+
+
+class HTTPStatusError(FetchError):
+    def __init__(self, url, status):
+        super().__init__(f'HTTP {status} for {url}')
+        self.url = url
+        self.status = status
+
+
+class ResponseTooLarge(FetchError):
+    """Response body went over the size limit."""
+
+
+class CircuitOpenError(FetchError):
+    """Source is being skipped until its breaker cooldown expires."""
+
+
+class ConnectionPool:
+    """Idle keep-alive connections, kept per (scheme, host, port)."""
+
+    def __init__(self, max_idle_per_host=MAX_IDLE_PER_HOST):
+        self.max_idle_per_host = max_idle_per_host
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, scheme, host, port, timeout):
+        """Get (connection, reused) for a host."""
+        key = (scheme, host, port)
+        with self.lock:
+            idle = self.idle.get(key)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return self.connect(scheme, host, port, timeout), False
+
+    def connect(self, scheme, host, port, timeout):
+        """Open a new (lazily connecting) connection, bypassing the pool."""
+        conn_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return conn_class(host, port, timeout=timeout)
+
+    def release(self, scheme, host, port, conn):
+        key = (scheme, host, port)
+        with self.lock:
+            idle = self.idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def clear(self):
+        with self.lock:
+            for idle in self.idle.values():
+                for conn in idle:
+                    conn.close()
+            self.idle.clear()
+
+
+class CircuitBreaker:
+    """Skips a source after repeated failures until a cooldown expires.
+
+    States: closed (normal), open (skip everything), half-open (one trial
+    request after the cooldown; success closes, failure reopens).
+    """
+
+    def __init__(self, name, failure_threshold=5, cooldown=60 * 60, directory=BREAKER_DIR):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.path = os.path.join(directory, f'breaker-{name}.json') if directory else None
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.failures = int(state.get('failures', 0))
+            self.opened_at = state.get('openedAt')
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'failures': self.failures, 'openedAt': self.opened_at}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f'  Could not save circuit breaker for {self.name}: {e}')
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.time() - self.opened_at < self.cooldown:
+            return 'open'
+        return 'half-open'
+
+    def before_request(self):
+        """Raise CircuitOpenError if this request should be skipped."""
+        with self.lock:
+            state = self.state
+            if state == 'open':
+                remaining = self.cooldown - (time.time() - self.opened_at)
+                raise CircuitOpenError(f'{self.name} circuit open, retrying in {remaining:.0f}s')
+            if state == 'half-open':
+                if self.trial_in_flight:
+                    raise CircuitOpenError(f'{self.name} circuit half-open, trial in flight')
+                self.trial_in_flight = True
+
+    def record_success(self):
+        with self.lock:
+            changed = self.failures or self.opened_at is not None
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+            if changed:
+                self.save()
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            was_trial = self.trial_in_flight
+            self.trial_in_flight = False
+            if was_trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+                print(f'  Circuit for {self.name} opened after {self.failures} failures')
+            self.save()
+
+
+# Shared across every Fetcher in the process
+pool = ConnectionPool()
+_hedge_executor = None
+_hedge_lock = threading.Lock()
+
+
+def hedge_executor():
+    global _hedge_executor
+    with _hedge_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='fetch')
+        return _hedge_executor
+
+
+class Fetcher:
+    """Fetches URLs for one source with retries, hedging and a breaker.
+
+    Args:
+        source: Source name, used for the circuit breaker
+        timeout: Socket timeout per attempt, in seconds
+        total_timeout: Seconds one get() may take in all, retries and hedges
+            included (default twice the timeout)
+        retries: Extra attempts after the first for retryable failures
+        backoff_base: First backoff ceiling in seconds (doubles per retry)
+        backoff_cap: Largest backoff ceiling in seconds
+        hedge_after: Seconds before racing a second GET (None disables)
+        max_bytes: Largest response body accepted
+        breaker: CircuitBreaker to use (default: persisted one for source)
+    """
+
+    def __init__(self, source, headers=None, timeout=DEFAULT_TIMEOUT, total_timeout=None,
+                 retries=3, backoff_base=0.5, backoff_cap=8.0, hedge_after=None,
+                 max_bytes=DEFAULT_MAX_BYTES, breaker=None):
+        self.source = source
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.total_timeout = total_timeout if total_timeout is not None else 2 * timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hedge_after = hedge_after
+        self.max_bytes = max_bytes
+        self.breaker = breaker if breaker is not None else CircuitBreaker(source)
+
+    def get(self, url, headers=None):
+        """GET a URL and return the body as bytes."""
+        self.breaker.before_request()
+        merged = {**self.headers, **(headers or {})}
+        deadline = time.monotonic() + self.total_timeout
+
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1)))
+                retry_after = getattr(last_error, 'retry_after', None)
+                if retry_after is not None:
+                    delay = max(delay, min(retry_after, self.backoff_cap))
+                if time.monotonic() + delay >= deadline:
+                    break
+                time.sleep(delay)
+
+            try:
+                body = self.hedged(url, merged, deadline)
+            except HTTPStatusError as e:
+                last_error = e
+                if e.status not in RETRY_STATUSES:
+                    break
+            except ResponseTooLarge:
+                self.breaker.record_success()  # The host answered; the page is just too big
+                raise
+            except (OSError, http.client.HTTPException) as e:
+                last_error = e
+                if isinstance(e, TimeoutError) and self.hedge_after:
+                    break  # Both the attempt and its hedge timed out already
+            else:
+                self.breaker.record_success()
+                return body
+
+        if isinstance(last_error, HTTPStatusError) and last_error.status not in BREAKER_STATUSES:
+            self.breaker.record_success()  # The host is up; the page just isn't there
+        else:
+            self.breaker.record_failure()
+        if isinstance(last_error, FetchError):
+            raise last_error
+        raise FetchError(f'{type(last_error).__name__} fetching {url}: {last_error}') from last_error
+
+    def get_text(self, url, headers=None, encoding='utf-8'):
+        return self.get(url, headers).decode(encoding)
+
+    def get_json(self, url, headers=None):
+        return json.loads(self.get(url, headers).decode('utf-8'))
+
+    def hedged(self, url, headers, deadline):
+        """One attempt, raced by a second request if it's slow.
+
+        Gives up with TimeoutError at the deadline (time.monotonic()); a
+        request still running then is left to hit its socket timeout.
+        """
+        if not self.hedge_after:
+            return self.fetch_once(url, headers, self.attempt_timeout(url, deadline))
+
+        executor = hedge_executor()
+        futures = [executor.submit(self.fetch_once, url, headers, self.attempt_timeout(url, deadline))]
+        done, _ = wait(futures, timeout=min(self.hedge_after, deadline - time.monotonic()))
+        if not done and time.monotonic() < deadline:
+            futures.append(executor.submit(self.fetch_once, url, headers,
+                                           self.attempt_timeout(url, deadline)))
+
+        # First success wins; a failure only counts once both have failed
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError(f'No response from {url} within {self.total_timeout}s')
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+        raise error
+
+    def attempt_timeout(self, url, deadline):
+        """Socket timeout for a request starting now: the rest of the deadline, at most."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f'No response from {url} within {self.total_timeout}s')
+        return min(self.timeout, remaining)
+
+    def fetch_once(self, url, headers, timeout=None):
+        """Single request (following redirects) with size limit."""
+        for _ in range(MAX_REDIRECTS + 1):
+            status, response_headers, body = self.request(url, headers, timeout)
+            if status in REDIRECT_STATUSES and response_headers.get('location'):
+                url = urljoin(url, response_headers['location'])
+                continue
+            if status >= 400:
+                error = HTTPStatusError(url, status)
+                retry_after = response_headers.get('retry-after')
+                if retry_after and retry_after.isdigit():
+                    error.retry_after = int(retry_after)
+                raise error
+            return body
+        raise FetchError(f'Too many redirects for {url}')
+
+    def request(self, url, headers, timeout=None):
+        """GET over a pooled connection; returns (status, headers, body)."""
+        timeout = timeout or self.timeout
+        parts = urlsplit(url)
+        scheme = parts.scheme or 'http'
+        port = parts.port or (443 if scheme == 'https' else 80)
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+
+        conn, reused = pool.acquire(scheme, parts.hostname, port, timeout)
+        try:
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive; retry on a fresh one
+                conn.close()
+                conn = pool.connect(scheme, parts.hostname, port, timeout)
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+
+            response_headers = {k.lower(): v for k, v in response.getheaders()}
+            body = self.read_limited(response, url)
+        except Exception:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            pool.release(scheme, parts.hostname, port, conn)
+        return response.status, response_headers, body
+
+    def read_limited(self, response, url):
+        length = response.getheader('Content-Length')
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            raise ResponseTooLarge(f'{url} is {length} bytes (limit {self.max_bytes})')
+
+        chunks = []
+        total = 0
+        while True:
+            chunk = response.read(64 * 1024)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > self.max_bytes:
+                raise ResponseTooLarge(f'{url} exceeded {self.max_bytes} bytes')
+            chunks.append(chunk)
+        return b''.join(chunks)
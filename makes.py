@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Makes
+Known car makes and where they're from. Kept free of scraping imports so
+the web server can use it too.
+"""
+
+# Known car makes for parsing
+KNOWN_MAKES = [
+    'Acura', 'Alfa Romeo', 'Aston Martin', 'Audi', 'Bentley', 'BMW', 'Bugatti',
+    'Buick', 'Cadillac', 'Chevrolet', 'Chevy', 'Chrysler', 'Citroën', 'Datsun',
+    'De Tomaso', 'Dodge', 'Ferrari', 'Fiat', 'Ford', 'Genesis', 'GMC', 'Honda',
+    'Hummer', 'Hyundai', 'Infiniti', 'Jaguar', 'Jeep', 'Kia', 'Lamborghini',
+    'Land Rover', 'Lexus', 'Lincoln', 'Lotus', 'Maserati', 'Mazda', 'McLaren',
+    'Mercedes-Benz', 'Mercedes', 'Mercury', 'Mini', 'Mitsubishi', 'Nissan',
+    'Oldsmobile', 'Pagani', 'Peugeot', 'Plymouth', 'Pontiac', 'Porsche', 'Ram',
+    'Renault', 'Rolls-Royce', 'Saab', 'Saturn', 'Scion', 'Subaru', 'Suzuki',
+    'Tesla', 'Toyota', 'Triumph', 'Volkswagen', 'VW', 'Volvo', 'AMC',
+    'American Motors', 'Austin-Healey', 'DeLorean', 'DeTomaso', 'Hudson',
+    'International', 'Kaiser', 'Nash', 'Packard', 'Shelby', 'Studebaker',
+    'Willys', 'MG', 'TVR', 'Lancia', 'Opel', 'Vauxhall', 'Seat', 'Skoda'
+]
+
+# Country of origin by make, matching BaT's ?origin= filter values
+MAKE_ORIGINS = {
+    'american': [
+        'AMC', 'American Motors', 'Buick', 'Cadillac', 'Chevrolet', 'Chevy',
+        'Chrysler', 'DeLorean', 'Dodge', 'Ford', 'GMC', 'Hudson', 'Hummer',
+        'International', 'Jeep', 'Kaiser', 'Lincoln', 'Mercury', 'Nash',
+        'Oldsmobile', 'Packard', 'Plymouth', 'Pontiac', 'Ram', 'Saturn',
+        'Shelby', 'Studebaker', 'Tesla', 'Willys'
+    ],
+    'japanese': [
+        'Acura', 'Datsun', 'Honda', 'Infiniti', 'Lexus', 'Mazda', 'Mitsubishi',
+        'Nissan', 'Scion', 'Subaru', 'Suzuki', 'Toyota'
+    ],
+    'german': [
+        'Audi', 'BMW', 'Mercedes-Benz', 'Mercedes', 'Opel', 'Porsche',
+        'Volkswagen', 'VW'
+    ],
+    'british': [
+        'Aston Martin', 'Austin-Healey', 'Bentley', 'Jaguar', 'Land Rover',
+        'Lotus', 'McLaren', 'MG', 'Mini', 'Rolls-Royce', 'Triumph', 'TVR',
+        'Vauxhall'
+    ],
+    'italian': [
+        'Alfa Romeo', 'De Tomaso', 'DeTomaso', 'Ferrari', 'Fiat', 'Lamborghini',
+        'Lancia', 'Maserati', 'Pagani'
+    ],
+    'french': ['Bugatti', 'Citroën', 'Peugeot', 'Renault'],
+    'swedish': ['Saab', 'Volvo'],
+    'korean': ['Genesis', 'Hyundai', 'Kia'],
+    'spanish': ['Seat'],
+    'czech': ['Skoda'],
+}
+ORIGIN_BY_MAKE = {make.lower(): origin for origin, makes in MAKE_ORIGINS.items() for make in makes}
+
+
+def make_origin(make):
+    """Get the country of origin for a make, or None if unknown."""
+    return ORIGIN_BY_MAKE.get(make.lower())
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Source Pipeline
+Shared generator stages that turn an auction site's pages into cars.
+
+    fetch -> extract -> parse -> filter -> dedupe
+
+A source plugin (a Source subclass) lists the pages to fetch, pulls raw
+listings out of a page and reads the id, title and image from one listing.
+HTTP, title parsing, motorcycle filtering, dedupe and counters are shared.
+The stages are lazy: cars come out as each page is parsed, and a consumer
+that stops early stops the fetching too.
+
+To add a site, subclass Source in scrapers.py and list it in
+scrape_worker.SOURCES.
+"""
+
+import queue
+import re
+import threading
+import time
+
+from fetch import CircuitOpenError, Fetcher
+from makes import KNOWN_MAKES, make_origin
+
+STAGES = ('fetch', 'extract', 'parse', 'filter', 'dedupe')
+
+# Motorcycle-only makes (always filter these out)
+MOTORCYCLE_MAKES = [
+    'Harley-Davidson', 'Harley Davidson', 'Harley', 'Ducati', 'Kawasaki',
+    'Yamaha', 'Suzuki', 'Indian', 'Moto Guzzi', 'Aprilia', 'KTM', 'MV Agusta',
+    'Norton', 'BSA', 'Royal Enfield', 'Husqvarna', 'Benelli', 'Bimota',
+    'Buell', 'Victory', 'Can-Am', 'Ural', 'Zero', 'Confederate', 'Arch'
+]
+
+# Keywords that indicate a motorcycle (in title)
+MOTORCYCLE_KEYWORDS = ['motorcycle', 'motorbike', 'bike', 'scooter', 'moped']
+
+
+def is_motorcycle(title, make=None):
+    """Check if a listing is a motorcycle (should be filtered out)."""
+    title_lower = title.lower()
+
+    # Check for motorcycle keywords in title
+    for keyword in MOTORCYCLE_KEYWORDS:
+        if keyword in title_lower:
+            return True
+
+    # Check if make is a motorcycle-only brand
+    if make:
+        make_lower = make.lower()
+        for moto_make in MOTORCYCLE_MAKES:
+            if moto_make.lower() == make_lower or moto_make.lower() in make_lower:
+                return True
+
+    # Also check title for motorcycle makes
+    for moto_make in MOTORCYCLE_MAKES:
+        if moto_make.lower() in title_lower:
+            return True
+
+    return False
+
+
+def parse_car_title(title):
+    """Parse year, make, model from a car title."""
+    cleaned = ' '.join(title.split())
+    year_match = re.match(r'^(\d{4})\s+', cleaned)
+
+    if not year_match:
+        return None
+
+    year = year_match.group(1)
+    rest = cleaned[len(year_match.group(0)):]
+
+    # Find make
+    make = None
+    model_start = 0
+
+    for known_make in KNOWN_MAKES:
+        if rest.lower().startswith(known_make.lower()):
+            make = known_make
+            model_start = len(known_make)
+            break
+
+    if not make:
+        first_space = rest.find(' ')
+        if first_space > 0:
+            make = rest[:first_space]
+            model_start = first_space
+        else:
+            make = rest
+            model_start = len(rest)
+
+    # Get model
+    model_part = rest[model_start:].strip()
+
+    # Remove common suffixes
+    suffix_patterns = [
+        r'\s+\d+-Speed$',
+        r'\s+Manual$',
+        r'\s+Automatic$',
+        r'\s+Auto$',
+        r'\s+Coupe$',
+        r'\s+Sedan$',
+        r'\s+Convertible$',
+        r'\s+Wagon$',
+        r'\s+Hatchback$',
+        r'\s+SUV$',
+        r'\s+Roadster$',
+        r'\s+Cabriolet$',
+        r'\s+Targa$',
+        r'\s+Spyder$',
+        r'\s+Spider$',
+    ]
+
+    for pattern in suffix_patterns:
+        model_part = re.sub(pattern, '', model_part, flags=re.IGNORECASE)
+
+    # Take first 2-3 words as model
+    model_words = [w for w in model_part.split() if w]
+    model = ' '.join(model_words[:3]).strip()
+
+    if not model:
+        model = model_words[0] if model_words else 'Unknown'
+
+    return {'year': year, 'make': make, 'model': model}
+
+
+class Page:
+    """One page to fetch.
+
+    Args:
+        url: Page URL
+        headers: Extra request headers
+        kind: Plugin-defined hint for extract() (e.g. 'api' or 'html')
+        tags: Car fields the page vouches for, applied to every car on it
+            (e.g. {'origin': 'japanese'} for an origin-filtered listing)
+    """
+
+    def __init__(self, url, headers=None, kind=None, tags=None):
+        self.url = url
+        self.headers = headers
+        self.kind = kind
+        self.tags = tags or {}
+
+
+class Source:
+    """Base class for source plugins.
+
+    Subclasses set name and label and implement pages(), extract() and
+    parse(). Sources that aren't plain HTTP override fetch().
+    """
+
+    name = ''            # Cache key, e.g. 'bring_a_trailer'
+    label = ''           # Shown on each car, e.g. 'Bring A Trailer'
+    max_cars = 1000
+    page_delay = 0.0     # Seconds between page fetches
+    fetch_options = {}   # Extra Fetcher arguments (headers, timeout, ...)
+
+    def pages(self, stats):
+        """Yield Pages to fetch.
+
+        Runs lazily, so stats show what earlier pages produced (e.g. to try
+        a fallback page only when the first one gave no cars).
+        """
+        raise NotImplementedError
+
+    def extract(self, page, body):
+        """Return the raw listings on one fetched page."""
+        raise NotImplementedError
+
+    def parse(self, item):
+        """Read one raw listing as {id, title, imageUrl, auctionUrl}, or None."""
+        raise NotImplementedError
+
+    def fetch(self, stats):
+        """Yield (page, body) for each page that could be fetched."""
+        counter = stats['fetch']
+        fetcher = Fetcher(self.name, **self.fetch_options)
+        for page in self.pages(stats):
+            counter.items_in += 1
+            start = time.perf_counter()
+            try:
+                body = fetcher.get_text(page.url, page.headers)
+            except CircuitOpenError as e:
+                print(f'  Skipping {self.label}: {e}')
+                return
+            except Exception as e:
+                print(f'  Error fetching {page.url}: {e}')
+                continue
+            finally:
+                counter.seconds += time.perf_counter() - start
+
+            counter.items_out += 1
+            counter.bytes += len(body)
+            yield page, body
+            if self.page_delay:
+                time.sleep(self.page_delay)
+
+
+class StageCounter:
+    """Items in and out of one stage, and time spent in it."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def as_dict(self):
+        counts = {
+            'in': self.items_in,
+            'out': self.items_out,
+            'seconds': round(self.seconds, 4),
+            'perSecond': round(self.items_in / self.seconds, 1) if self.seconds else None,
+        }
+        if self.bytes:
+            counts['bytes'] = self.bytes
+        return counts
+
+
+class PipelineStats:
+    """A StageCounter for each stage of one source's run."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.stages = {stage: StageCounter(stage) for stage in STAGES}
+
+    def __getitem__(self, stage):
+        return self.stages[stage]
+
+    def as_dict(self):
+        return {
+            'elapsed': round(time.monotonic() - self.started, 3),
+            'stages': {stage: counter.as_dict() for stage, counter in self.stages.items()},
+        }
+
+    def summary(self):
+        return ', '.join(f'{c.name} {c.items_in}->{c.items_out} in {c.seconds:.2f}s'
+                         for c in self.stages.values())
+
+
+def extract_stage(source, pages, counter):
+    """Yield (page, item) for every raw listing on every page."""
+    for page, body in pages:
+        counter.items_in += 1
+        start = time.perf_counter()
+        try:
+            items = list(source.extract(page, body))
+        except Exception as e:
+            print(f'  Could not extract listings from {page.url}: {e}')
+            items = []
+        counter.seconds += time.perf_counter() - start
+        counter.items_out += len(items)
+        for item in items:
+            yield page, item
+
+
+def parse_stage(source, items, counter):
+    """Yield (page, car) for every listing with a readable title and image."""
+    for page, item in items:
+        counter.items_in += 1
+        start = time.perf_counter()
+        try:
+            listing = source.parse(item)
+            parsed = parse_car_title(listing['title']) if listing else None
+            car = {
+                'id': listing['id'],
+                'source': source.label,
+                'title': listing['title'],
+                **parsed,
+                'origin': make_origin(parsed['make']),
+                'imageUrl': listing['imageUrl'],
+                'auctionUrl': listing.get('auctionUrl', ''),
+                **page.tags,
+            } if parsed else None
+        except Exception as e:
+            # One malformed listing is dropped, not the rest of the source
+            print(f'  Could not parse a listing from {page.url}: {e!r}')
+            car = None
+        counter.seconds += time.perf_counter() - start
+        if car is not None:
+            counter.items_out += 1
+            yield page, car
+
+
+def filter_stage(cars, counter):
+    """Drop motorcycles."""
+    for page, car in cars:
+        counter.items_in += 1
+        start = time.perf_counter()
+        keep = not is_motorcycle(car['title'], car['make'])
+        counter.seconds += time.perf_counter() - start
+        if keep:
+            counter.items_out += 1
+            yield page, car
+
+
+def dedupe_stage(cars, counter, limit):
+    """Yield each car once, stopping after `limit` unique cars.
+
+    A repeat from a page whose tags add something new (BaT's origin pages)
+    is yielded again with the tags applied; consumers keep the latest car
+    for each id.
+    """
+    seen = {}
+    for page, car in cars:
+        counter.items_in += 1
+        start = time.perf_counter()
+        known = seen.get(car['id'])
+        if known is None:
+            seen[car['id']] = dict(car)
+            out = car
+        else:
+            updates = {k: v for k, v in page.tags.items() if known.get(k) != v}
+            known.update(updates)
+            out = dict(known) if updates else None
+        counter.seconds += time.perf_counter() - start
+
+        if out is not None:
+            counter.items_out += 1
+            yield out
+            if known is None and len(seen) >= limit:
+                return
+
+
+def run(source, stats=None):
+    """Run a source through every stage; yields cars as they're found."""
+    stats = stats if stats is not None else PipelineStats()
+    pages = source.fetch(stats)
+    items = extract_stage(source, pages, stats['extract'])
+    cars = parse_stage(source, items, stats['parse'])
+    cars = filter_stage(cars, stats['filter'])
+    return dedupe_stage(cars, stats['dedupe'], source.max_cars)
+
+
+def batched(cars, size, interval, idle=0.1):
+    """Group cars into lists of up to `size`.
+
+    The cars are pulled on a helper thread, so a partial batch is flushed
+    once no car has arrived for `idle` seconds (the pipeline is waiting on
+    the next page) or `interval` seconds after its first car.
+    """
+    items = queue.Queue(maxsize=size * 4)
+
+    def produce():
+        try:
+            for car in cars:
+                items.put(('car', car))
+            items.put(('done', None))
+        except Exception as e:
+            items.put(('error', e))
+
+    threading.Thread(target=produce, name='pipeline', daemon=True).start()
+
+    batch = []
+    deadline = None
+    while True:
+        timeout = max(0, min(deadline - time.monotonic(), idle)) if batch else None
+        try:
+            kind, payload = items.get(timeout=timeout)
+        except queue.Empty:
+            yield batch
+            batch = []
+            continue
+
+        if kind == 'done':
+            break
+        if kind == 'error':
+            raise payload
+
+        batch.append(payload)
+        if len(batch) == 1:
+            deadline = time.monotonic() + interval
+        if len(batch) >= size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Developer Profiling
+On-demand cProfile/sampling sessions and opt-in timing spans.
+
+Everything here is off unless CARGAME_PROFILING=1 and CARGAME_PROFILE_TOKEN
+are both set. While tracing is off, span() hands back a shared no-op context
+manager, so instrumented code pays a single thread-local lookup.
+"""
+
+import contextlib
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+TOKEN = os.environ.get('CARGAME_PROFILE_TOKEN', '')
+ENABLED = os.environ.get('CARGAME_PROFILING') == '1' and bool(TOKEN)
+
+# Runtime switch for per-request/per-refresh spans (toggled via the debug API)
+tracing = False
+
+# Allowed sampling intervals in seconds; shorter would busy-loop a thread
+MIN_SAMPLE_INTERVAL = 0.001
+MAX_SAMPLE_INTERVAL = 1.0
+
+# Most recent finished traces, newest last
+recent_traces = deque(maxlen=200)
+
+_local = threading.local()
+_NULL_SPAN = contextlib.nullcontext()
+_session_lock = threading.Lock()
+_session = None
+
+
+def check_token(value):
+    """Check a request token against the configured one."""
+    # Compare bytes: compare_digest rejects non-ASCII str
+    return ENABLED and hmac.compare_digest((value or '').encode('utf-8'), TOKEN.encode('utf-8'))
+
+
+class Trace:
+    """Timing spans for one request or refresh, aggregated by name."""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.spans = {}
+
+    def add(self, name, elapsed):
+        total, count = self.spans.get(name, (0.0, 0))
+        self.spans[name] = (total + elapsed, count + 1)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+
+    def server_timing(self):
+        """Format spans for a Server-Timing response header."""
+        return ', '.join(f'{name};dur={total * 1000:.3f}'
+                         for name, (total, _) in self.spans.items())
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'startedAt': self.started_at,
+            'durationMs': round((self.duration or 0) * 1000, 3),
+            'spans': {name: {'ms': round(total * 1000, 3), 'count': count}
+                      for name, (total, count) in self.spans.items()},
+        }
+
+
+class _Span:
+    __slots__ = ('trace', 'name', 'start')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def span(name):
+    """Time a block into the current thread's trace, if there is one."""
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, name)
+
+
+def current_trace():
+    """Get the trace active on this thread, or None."""
+    return getattr(_local, 'trace', None)
+
+
+def start_trace(name):
+    """Start a trace on this thread.
+
+    Returns None when tracing is off or a trace is already running here, in
+    which case spans keep going to the outer trace.
+    """
+    if not tracing or getattr(_local, 'trace', None) is not None:
+        return None
+    trace = Trace(name)
+    _local.trace = trace
+    return trace
+
+
+def finish_trace(trace):
+    """Finish a trace returned by start_trace and keep it for download."""
+    if trace is None:
+        return
+    _local.trace = None
+    trace.finish()
+    recent_traces.append(trace.to_dict())
+
+
+class SamplingProfiler:
+    """Periodically sample the stacks of every thread.
+
+    Results are folded stacks ("outer;inner;leaf count"), which flame graph
+    tools accept directly.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def stats(self):
+        lines = [f'{stack} {count}' for stack, count in self.samples.most_common()]
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class ProfileSession:
+    """One profiling session over live traffic."""
+
+    def __init__(self, mode, interval=0.005):
+        self.mode = mode
+        self.started_at = time.time()
+        self.stopped_at = None
+        if mode == 'cprofile':
+            # cProfile only sees the thread that enables it, which is the
+            # request-serving thread when started from the debug API
+            import cProfile
+            self.profiler = cProfile.Profile()
+        else:
+            self.profiler = SamplingProfiler(interval)
+
+    def start(self):
+        if self.mode == 'cprofile':
+            self.profiler.enable()
+        else:
+            self.profiler.start()
+
+    def stop(self):
+        if self.mode == 'cprofile':
+            self.profiler.disable()
+        else:
+            self.profiler.stop()
+        self.stopped_at = time.time()
+
+    def stats(self, fmt='text'):
+        """Get (content_type, bytes) for the collected stats."""
+        if self.mode != 'cprofile':
+            return 'text/plain; charset=utf-8', self.profiler.stats()
+
+        import io
+        import marshal
+        import pstats
+
+        if fmt == 'pstats':
+            # Same format as Profile.dump_stats, loadable with pstats.Stats
+            self.profiler.create_stats()
+            return 'application/octet-stream', marshal.dumps(self.profiler.stats)
+
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats('cumulative').print_stats(60)
+        return 'text/plain; charset=utf-8', out.getvalue().encode('utf-8')
+
+    def to_dict(self):
+        return {
+            'mode': self.mode,
+            'startedAt': self.started_at,
+            'stoppedAt': self.stopped_at,
+            'running': self.stopped_at is None,
+        }
+
+
+def start_session(mode='cprofile', interval=0.005):
+    """Start a new profiling session, replacing any finished one."""
+    global _session
+    if mode not in ('cprofile', 'sampling'):
+        raise ValueError(f'Unknown profiler mode: {mode}')
+    if not MIN_SAMPLE_INTERVAL <= interval <= MAX_SAMPLE_INTERVAL:
+        raise ValueError(f'interval must be between {MIN_SAMPLE_INTERVAL} '
+                         f'and {MAX_SAMPLE_INTERVAL} seconds')
+    with _session_lock:
+        if _session and _session.stopped_at is None:
+            raise RuntimeError('A profiling session is already running')
+        _session = ProfileSession(mode, interval)
+        _session.start()
+        return _session
+
+
+def stop_session():
+    """Stop the running profiling session."""
+    with _session_lock:
+        if not _session or _session.stopped_at is not None:
+            raise RuntimeError('No profiling session is running')
+        _session.stop()
+        return _session
+
+
+def get_session():
+    """Get the current or last profiling session, or None."""
+    return _session
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Multiplayer Rooms
+Room-based competition with a shared car sequence and synchronized timer,
+pushed to players over Server-Sent Events.
+
+The HTTP server accepts each /events request, writes the SSE headers and
+hands the socket to an asyncio loop running in its own thread, so thousands
+of idle connections cost one transport each and no threads. All room state
+lives on that loop; request handlers reach it through RoomHub.call().
+
+Every broadcast is encoded once and the same bytes are written to each
+subscriber.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import secrets
+import string
+import threading
+import time
+
+ROUND_SECONDS = int(os.environ.get('ROOM_ROUND_SECONDS', 30))
+REVEAL_SECONDS = int(os.environ.get('ROOM_REVEAL_SECONDS', 5))
+MAX_PLAYERS_PER_ROOM = int(os.environ.get('ROOM_MAX_PLAYERS', 1000))
+MAX_ROOMS = int(os.environ.get('ROOM_MAX_ROOMS', 500))
+
+CARS_PER_GAME = 10
+HEARTBEAT_SECONDS = 15
+STANDINGS_INTERVAL = 0.5   # Coalesce live standings broadcasts
+STANDINGS_TOP = 20         # Players listed in each standings broadcast
+ROOM_IDLE_SECONDS = 30 * 60
+
+# Drop subscribers that stop reading once this much is queued for them
+MAX_CLIENT_BUFFER = 256 * 1024
+
+SSE_HEARTBEAT = b': ping\n\n'
+
+
+class RoomError(Exception):
+    """Room request that can't be satisfied; carries an HTTP status."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def encode_event(event, data):
+    """Encode one SSE message."""
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'.encode('utf-8')
+
+
+class Subscriber(asyncio.Protocol):
+    """One SSE connection. Incoming bytes are ignored."""
+
+    def __init__(self, room, player_id):
+        self.room = room
+        self.player_id = player_id
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.room.subscribers.add(self)
+
+    def connection_lost(self, exc):
+        self.room.subscribers.discard(self)
+
+    def send(self, payload):
+        if self.transport.is_closing():
+            return
+        if self.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+            self.transport.abort()
+            return
+        self.transport.write(payload)
+
+
+class Player:
+    def __init__(self, name):
+        self.name = name
+        self.score = 0
+        self.answered = set()
+
+
+class Room:
+    """One multiplayer game. Only touched from the hub's event loop."""
+
+    def __init__(self, hub, room_id, cars, round_seconds):
+        self.hub = hub
+        self.id = room_id
+        self.cars = cars
+        self.round_seconds = round_seconds
+        self.players = {}
+        self.subscribers = set()
+        self.state = 'lobby'
+        self.round = -1
+        self.ends_at = None
+        self.round_timer = None
+        self.standings_pending = False
+        self.last_activity = time.monotonic()
+
+    def broadcast(self, event, data):
+        """Encode once, then write the same bytes to every subscriber."""
+        payload = encode_event(event, {**data, 'sentAt': time.time() * 1000})
+        self.hub.encoded_broadcasts += 1
+        for subscriber in list(self.subscribers):
+            subscriber.send(payload)
+
+    def public_car(self, index):
+        car = self.cars[index]
+        return {'id': car['id'], 'imageUrl': car['imageUrl'], 'source': car['source']}
+
+    def standings(self):
+        ranked = sorted(self.players.items(), key=lambda kv: -kv[1].score)
+        return {
+            'players': len(self.players),
+            'top': [{'name': p.name, 'score': p.score} for _, p in ranked[:STANDINGS_TOP]],
+        }
+
+    def snapshot(self):
+        snapshot = {
+            'roomId': self.id,
+            'state': self.state,
+            'round': self.round,
+            'totalRounds': len(self.cars),
+            'roundSeconds': self.round_seconds,
+            'endsAt': self.ends_at,
+            'connected': len(self.subscribers),
+            'standings': self.standings(),
+        }
+        if self.state == 'playing':
+            snapshot['car'] = self.public_car(self.round)
+        return snapshot
+
+    def join(self, name):
+        if len(self.players) >= MAX_PLAYERS_PER_ROOM:
+            raise RoomError('Room is full', 409)
+        player_id = secrets.token_urlsafe(8)
+        self.players[player_id] = Player(name[:30] or 'Player')
+        self.last_activity = time.monotonic()
+        self.queue_standings()
+        return player_id
+
+    def start(self):
+        if self.state != 'lobby':
+            raise RoomError('Game already started', 409)
+        self.state = 'playing'
+        self.begin_round(0)
+
+    def begin_round(self, index):
+        self.round = index
+        self.ends_at = (time.time() + self.round_seconds) * 1000
+        self.round_timer = self.hub.loop.call_later(self.round_seconds, self.end_round, index)
+        self.broadcast('round', {
+            'round': index,
+            'totalRounds': len(self.cars),
+            'car': self.public_car(index),
+            'endsAt': self.ends_at,
+        })
+
+    def answer(self, player_id, car_id, year, make, model):
+        player = self.players.get(player_id)
+        if not player:
+            raise RoomError('Unknown player', 404)
+        if self.state != 'playing' or car_id != self.cars[self.round]['id']:
+            raise RoomError('That round is over', 409)
+        if self.round in player.answered:
+            raise RoomError('Already answered this round', 409)
+
+        result = self.hub.score(self.cars[self.round], year, make, model)
+        result.pop('correctAnswer', None)  # Revealed to everyone at round end
+        player.answered.add(self.round)
+        player.score += result['score']
+        result['totalScore'] = player.score
+        self.last_activity = time.monotonic()
+
+        if all(self.round in p.answered for p in self.players.values()):
+            self.end_round(self.round)
+        else:
+            self.queue_standings()
+        return result
+
+    def queue_standings(self):
+        """Broadcast standings soon, folding bursts of answers into one."""
+        if not self.standings_pending:
+            self.standings_pending = True
+            self.hub.loop.call_later(STANDINGS_INTERVAL, self.flush_standings)
+
+    def flush_standings(self):
+        self.standings_pending = False
+        self.broadcast('standings', self.standings())
+
+    def end_round(self, index):
+        if self.state != 'playing' or index != self.round:
+            return
+        self.round_timer.cancel()
+        car = self.cars[index]
+        self.broadcast('reveal', {
+            'round': index,
+            'correctAnswer': {
+                'year': car['year'],
+                'make': car['make'],
+                'model': car['model'],
+                'title': car['title'],
+                'auctionUrl': car['auctionUrl'],
+            },
+            'standings': self.standings(),
+        })
+
+        if index + 1 < len(self.cars):
+            self.state = 'reveal'
+            self.ends_at = (time.time() + REVEAL_SECONDS) * 1000
+            self.hub.loop.call_later(REVEAL_SECONDS, self.next_round, index + 1)
+        else:
+            self.state = 'finished'
+            self.ends_at = None
+            self.broadcast('finished', {'standings': self.standings()})
+
+    def next_round(self, index):
+        self.state = 'playing'
+        self.begin_round(index)
+
+
+class RoomHub:
+    """Owns the event loop and every room."""
+
+    def __init__(self, pick_cars, score):
+        """
+        Args:
+            pick_cars: Callable returning CARS_PER_GAME unique cars
+            score: Callable (car, year, make, model) -> check-answer dict
+        """
+        self.pick_cars = pick_cars
+        self.score = score
+        self.rooms = {}
+        self.loop = None
+        self.encoded_broadcasts = 0
+        self._start_lock = threading.Lock()
+
+    def ensure_started(self):
+        """Start the event loop thread on first use."""
+        with self._start_lock:
+            if self.loop is not None:
+                return
+            ready = threading.Event()
+            thread = threading.Thread(target=self._run, args=(ready,), name='rooms', daemon=True)
+            thread.start()
+            ready.wait()
+
+    def _run(self, ready):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(ready.set)
+        self.loop.call_later(HEARTBEAT_SECONDS, self.heartbeat)
+        self.loop.run_forever()
+
+    def call(self, func, *args, timeout=5):
+        """Run func(*args) on the loop thread and return its result."""
+        self.ensure_started()
+        future = concurrent.futures.Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return  # The caller gave up waiting
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+        self.loop.call_soon_threadsafe(run)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise RoomError('Rooms are busy, try again shortly', 503)
+
+    def heartbeat(self):
+        """Keep idle connections open through proxies and drop dead rooms."""
+        now = time.monotonic()
+        for room_id, room in list(self.rooms.items()):
+            if now - room.last_activity > ROOM_IDLE_SECONDS and room.state in ('lobby', 'finished'):
+                for subscriber in list(room.subscribers):
+                    subscriber.transport.close()
+                del self.rooms[room_id]
+                continue
+            for subscriber in list(room.subscribers):
+                subscriber.send(SSE_HEARTBEAT)
+        self.loop.call_later(HEARTBEAT_SECONDS, self.heartbeat)
+
+    def get_room(self, room_id):
+        room = self.rooms.get(room_id)
+        if not room:
+            raise RoomError('Room not found', 404)
+        return room
+
+    # The methods below run on the loop thread via call()
+
+    def _create(self, round_seconds, filters):
+        if len(self.rooms) >= MAX_ROOMS:
+            raise RoomError('Too many rooms open, try again later', 503)
+        cars = self.pick_cars(CARS_PER_GAME, filters)
+        if len(cars) < CARS_PER_GAME:
+            raise RoomError('Not enough cars available. Please try again later.', 503)
+
+        alphabet = string.ascii_uppercase + string.digits
+        room_id = ''.join(secrets.choice(alphabet) for _ in range(6))
+        while room_id in self.rooms:
+            room_id = ''.join(secrets.choice(alphabet) for _ in range(6))
+        self.rooms[room_id] = Room(self, room_id, cars, round_seconds)
+        return self.rooms[room_id].snapshot()
+
+    def _subscribe(self, room_id, player_id, sock):
+        room = self.rooms.get(room_id)
+        if not room or player_id not in room.players:
+            sock.close()
+            return
+        self.loop.create_task(self._attach(room, player_id, sock))
+
+    async def _attach(self, room, player_id, sock):
+        transport, subscriber = await self.loop.connect_accepted_socket(
+            lambda: Subscriber(room, player_id), sock=sock
+        )
+        # Catch the newcomer up on where the game is
+        subscriber.send(encode_event('snapshot', room.snapshot()))
+
+    def _join(self, room_id, name):
+        return {'roomId': room_id, 'playerId': self.get_room(room_id).join(name)}
+
+    def _start(self, room_id):
+        room = self.get_room(room_id)
+        room.start()
+        return room.snapshot()
+
+    def _answer(self, room_id, player_id, car_id, year, make, model):
+        return self.get_room(room_id).answer(player_id, car_id, year, make, model)
+
+    def _snapshot(self, room_id):
+        return self.get_room(room_id).snapshot()
+
+    def _check_player(self, room_id, player_id):
+        if player_id not in self.get_room(room_id).players:
+            raise RoomError('Unknown player', 404)
+
+    # Thread-safe entry points for request handlers
+
+    def create_room(self, round_seconds=ROUND_SECONDS, filters=()):
+        try:
+            round_seconds = max(5, min(int(round_seconds), 120))
+        except (TypeError, ValueError, OverflowError):
+            raise RoomError('roundSeconds must be a number', 400)
+        return self.call(self._create, round_seconds, filters)
+
+    def join(self, room_id, name):
+        return self.call(self._join, room_id, name)
+
+    def start(self, room_id):
+        return self.call(self._start, room_id)
+
+    def answer(self, room_id, player_id, car_id, year, make, model):
+        if not isinstance(player_id, str) or not isinstance(car_id, str):
+            raise RoomError('playerId and carId must be strings', 400)
+        return self.call(self._answer, room_id, player_id, car_id, year, make, model)
+
+    def snapshot(self, room_id):
+        return self.call(self._snapshot, room_id)
+
+    def check_player(self, room_id, player_id):
+        """Raise RoomError unless player_id has joined room_id."""
+        self.call(self._check_player, room_id, player_id)
+
+    def subscribe(self, room_id, player_id, sock):
+        """Take ownership of an accepted socket whose SSE headers are sent."""
+        self.ensure_started()
+        sock.setblocking(False)
+        self.loop.call_soon_threadsafe(self._subscribe, room_id, player_id, sock)
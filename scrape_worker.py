@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Scrape Workers
+Runs each scraper in its own process so refreshes never compete with
+request handling for the GIL or leave browser memory in the web server.
+
+Each source gets one worker process, all running at once. A worker runs
+its source through the pipeline (see pipeline.py) and sends cars back over
+a pipe in batches as they are parsed, with the pipeline's stage counters.
+Workers have a hard timeout and a memory cap, and a worker that crashes is
+restarted.
+"""
+
+import importlib
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing.connection import wait
+
+import pipeline
+
+# Source name -> "module:callable" returning a pipeline.Source (or any
+# iterable of car dicts)
+SOURCES = {
+    'bring_a_trailer': 'scrapers:BringATrailer',
+    'cars_and_bids': 'scrapers:CarsAndBids',
+}
+
+WORKER_TIMEOUT = float(os.environ.get('SCRAPE_WORKER_TIMEOUT', 15 * 60))
+WORKER_MEMORY_MB = int(os.environ.get('SCRAPE_WORKER_MEMORY_MB', 1536))
+WORKER_MAX_RESTARTS = int(os.environ.get('SCRAPE_WORKER_MAX_RESTARTS', 1))
+
+# Cars per message sent back to the server, and the longest a partial
+# batch waits for more
+BATCH_SIZE = 200
+BATCH_SECONDS = 1.0
+
+try:
+    PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = 4096
+
+
+def resolve_target(target):
+    """Import and return the callable named by "module:name"."""
+    module_name, name = target.split(':')
+    return getattr(importlib.import_module(module_name), name)
+
+
+def worker_main(target, conn):
+    """Worker process entry point: scrape and stream cars back in batches."""
+    # Own process group, so a kill also takes down any browser it launched
+    if hasattr(os, 'setsid'):
+        os.setsid()
+
+    try:
+        source = resolve_target(target)()
+        stats = None
+        if isinstance(source, pipeline.Source):
+            stats = pipeline.PipelineStats()
+            cars = pipeline.run(source, stats)
+        else:
+            cars = source
+
+        ids = set()
+        for batch in pipeline.batched(cars, BATCH_SIZE, BATCH_SECONDS):
+            ids.update(car['id'] for car in batch)
+            conn.send(('batch', batch))
+            if stats:
+                conn.send(('stats', stats.as_dict()))
+
+        if stats:
+            print(f'Found {len(ids)} cars from {source.label} ({stats.summary()})')
+            conn.send(('stats', stats.as_dict()))
+        conn.send(('done', len(ids)))
+    except Exception as e:
+        conn.send(('error', f'{type(e).__name__}: {e}'))
+    finally:
+        conn.close()
+
+
+def process_tree_rss(pid):
+    """Resident memory in bytes of a process and its descendants.
+
+    Reads /proc, so this is 0 (no cap enforced) on platforms without it.
+    """
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f'/proc/{current}/statm') as f:
+                total += int(f.read().split()[1]) * PAGE_SIZE
+            with open(f'/proc/{current}/task/{current}/children') as f:
+                stack.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+class ScrapeWorker:
+    """One scraper process and the cars (by id) it has sent so far."""
+
+    def __init__(self, context, name, target):
+        self.context = context
+        self.name = name
+        self.target = target
+        self.restarts = 0
+        self.start()
+
+    def start(self):
+        self.cars = {}
+        self.done = False
+        self.error = None
+        self.conn, child_conn = self.context.Pipe(duplex=False)
+        self.process = self.context.Process(
+            target=worker_main, args=(self.target, child_conn),
+            name=f'scrape-{self.name}', daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.started = time.monotonic()
+
+    def kill(self):
+        """Kill the worker and everything it spawned."""
+        try:
+            if hasattr(os, 'killpg'):
+                os.killpg(self.process.pid, signal.SIGKILL)
+            else:
+                self.process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+        self.process.join()
+        self.conn.close()
+
+    def receive(self):
+        """Handle and return one message, or None once the worker has finished."""
+        try:
+            kind, payload = self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join()
+            self.conn.close()
+            return None
+
+        if kind == 'batch':
+            # A car sent again (with updated fields) replaces the earlier one
+            self.cars.update((car['id'], car) for car in payload)
+        elif kind == 'done':
+            self.done = True
+        elif kind == 'error':
+            self.error = payload
+        return kind, payload
+
+
+def scrape_sources(sources=None, timeout=None, memory_mb=None, max_restarts=None,
+                   on_batch=None, on_stats=None):
+    """Run every source in its own worker process, all at once.
+
+    Args:
+        sources: Mapping of source name -> "module:callable" (default SOURCES)
+        timeout: Seconds before a worker is killed
+        memory_mb: Resident memory cap for a worker and its children
+        max_restarts: Restarts allowed for a worker that crashes
+        on_batch: Called with (source name, cars) as each batch arrives
+        on_stats: Called with (source name, stage counters) as they update
+
+    Returns:
+        Dict of source name -> cars, only for sources that finished. Failed
+        sources are left out so callers can keep their previous data.
+    """
+    sources = SOURCES if sources is None else sources
+    timeout = WORKER_TIMEOUT if timeout is None else timeout
+    memory_mb = WORKER_MEMORY_MB if memory_mb is None else memory_mb
+    max_restarts = WORKER_MAX_RESTARTS if max_restarts is None else max_restarts
+
+    # Spawn rather than fork: the server has threads and open sockets
+    context = multiprocessing.get_context('spawn')
+    running = {}
+    for name, target in sources.items():
+        worker = ScrapeWorker(context, name, target)
+        running[worker.conn] = worker
+    results = {}
+
+    while running:
+        for conn in wait(list(running), timeout=0.5):
+            worker = running[conn]
+            message = worker.receive()
+            if message is not None:
+                kind, payload = message
+                if kind == 'batch' and on_batch:
+                    on_batch(worker.name, payload)
+                elif kind == 'stats' and on_stats:
+                    on_stats(worker.name, payload)
+                continue
+
+            del running[conn]
+            if worker.done:
+                results[worker.name] = list(worker.cars.values())
+            elif worker.error:
+                print(f'  {worker.name} worker failed: {worker.error}')
+            elif worker.restarts < max_restarts:
+                worker.restarts += 1
+                print(f'  {worker.name} worker crashed (exit {worker.process.exitcode}), restarting')
+                worker.start()
+                running[worker.conn] = worker
+            else:
+                print(f'  {worker.name} worker crashed (exit {worker.process.exitcode}), giving up')
+
+        now = time.monotonic()
+        for conn, worker in list(running.items()):
+            if now - worker.started > timeout:
+                print(f'  {worker.name} worker timed out after {timeout:.0f}s')
+            elif memory_mb and process_tree_rss(worker.process.pid) > memory_mb * 1024 * 1024:
+                print(f'  {worker.name} worker exceeded {memory_mb} MB')
+            else:
+                continue
+            worker.kill()
+            del running[conn]
+
+    return results
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Scrapers
+Source plugins for Bring A Trailer and Cars And Bids (see pipeline.py).
+
+Imported only when a refresh actually runs, so the web server can start and
+serve cached data without paying for the scraping stack.
+"""
+
+import hashlib
+import importlib.util
+import json
+import re
+import time
+from html.parser import HTMLParser
+from urllib.parse import parse_qs
+
+from pipeline import Page, Source, is_motorcycle, parse_car_title  # noqa: F401 (re-exported)
+
+# Playwright is only imported once a browser scrape starts
+PLAYWRIGHT_AVAILABLE = importlib.util.find_spec('playwright') is not None
+if not PLAYWRIGHT_AVAILABLE:
+    print("Playwright not available - using basic scraping (limited cars)")
+
+# Browser headers
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+# Separator between a JSON key and its value
+JSON_KEY_SEPARATOR = re.compile(r'\s*:\s*')
+
+# Decoding "auctions" values stops once it has worked through this many
+# times a script's length, so decoy keys can't make a page quadratic
+MAX_SCAN_FACTOR = 4
+
+# A failed decode also scans the script from the start up to the error for
+# its line number, which is roughly this many times cheaper per byte
+ERROR_SCAN_DISCOUNT = 32
+
+
+def stable_listing_id(title):
+    """Build an id from a title that is the same in every process."""
+    return hashlib.sha1(title.encode('utf-8')).hexdigest()[:10]
+
+
+def extract_bat_data_from_html(html):
+    """Extract car data from BaT HTML page."""
+    marker = 'auctionsCompletedInitialData = '
+    start_idx = html.find(marker)
+
+    if start_idx == -1:
+        return []
+
+    json_start = start_idx + len(marker)
+    brace_count = 0
+    json_end = json_start
+
+    for i, char in enumerate(html[json_start:]):
+        if char == '{':
+            brace_count += 1
+        elif char == '}':
+            brace_count -= 1
+            if brace_count == 0:
+                json_end = json_start + i + 1
+                break
+
+    try:
+        data = json.loads(html[json_start:json_end])
+        return data.get('items', [])
+    except json.JSONDecodeError:
+        return []
+
+
+# Listing links scraped from a rendered BaT results page
+BAT_DOM_LISTINGS_SCRIPT = '''() => {
+    const items = [];
+    const links = document.querySelectorAll('a[href*="/listing/"]');
+    const seen = new Set();
+
+    links.forEach(link => {
+        const href = link.href;
+        if (seen.has(href)) return;
+        seen.add(href);
+
+        // Get title from h3 or title class
+        const titleEl = link.querySelector('h3, .title, [class*="title"]');
+        let title = titleEl?.textContent?.trim() || '';
+
+        // If no title element, try the link text itself
+        if (!title) {
+            title = link.textContent?.trim() || '';
+        }
+
+        // Get image
+        const img = link.querySelector('img') || link.parentElement?.querySelector('img');
+        const imgUrl = img?.src || img?.dataset?.src || '';
+
+        // Get ID from URL
+        const match = href.match(/listing\\/([^/]+)/);
+        const id = match ? match[1] : '';
+
+        // Only include if title starts with a year
+        if (title && title.match(/^\\d{4}/) && imgUrl && id) {
+            items.push({
+                title: title,
+                thumbnail_url: imgUrl,
+                id: id,
+                url: href
+            });
+        }
+    });
+
+    return items;
+}'''
+
+
+class BringATrailer(Source):
+    """Closed BaT auctions.
+
+    Uses a Playwright browser (clicking "Show More") when it's installed,
+    falling back to the data embedded in a set of filtered results pages.
+    BaT's embedded data is limited, so the filters maximize variety.
+    """
+
+    name = 'bring_a_trailer'
+    label = 'Bring A Trailer'
+    max_cars = 1000
+    page_delay = 0.2
+    fetch_options = {'headers': BROWSER_HEADERS, 'timeout': 15, 'hedge_after': 5}
+
+    RESULTS_URL = 'https://bringatrailer.com/auctions/results/'
+
+    # Different filters/pages to maximize unique cars
+    RESULTS_QUERIES = [
+        '', 'page=2', 'page=3',
+        'era=1980s', 'era=1990s', 'era=2000s', 'era=2010s', 'era=1970s', 'era=1960s',
+        'origin=american', 'origin=japanese', 'origin=german', 'origin=british', 'origin=italian',
+    ]
+
+    # Each click loads ~20 more cars
+    MAX_CLICKS = 20
+
+    def __init__(self, browser=PLAYWRIGHT_AVAILABLE):
+        self.browser = browser
+
+    def pages(self, stats):
+        for query in self.RESULTS_QUERIES:
+            # Origin pages tell us where a car is from, even if we've seen it
+            origin = parse_qs(query).get('origin', [None])[0]
+            yield Page(f'{self.RESULTS_URL}?{query}' if query else self.RESULTS_URL,
+                       tags={'origin': origin} if origin else None)
+
+    def fetch(self, stats):
+        if self.browser:
+            try:
+                yield from self.fetch_with_browser(stats['fetch'])
+                return
+            except Exception as e:
+                print(f'Playwright error: {e}')
+                print('Falling back to basic scraping...')
+        yield from super().fetch(stats)
+
+    def fetch_with_browser(self, counter):
+        """Yield (page, listings) for each batch of newly shown listings."""
+        from playwright.sync_api import sync_playwright
+
+        print('Scraping Bring A Trailer with Playwright...')
+        seen_ids = set()
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            try:
+                context = browser.new_context(user_agent=BROWSER_HEADERS['User-Agent'])
+                tab = context.new_page()
+                page = Page(self.RESULTS_URL, kind='dom')
+
+                counter.items_in += 1
+                start = time.perf_counter()
+                tab.goto(self.RESULTS_URL, timeout=60000)
+                tab.wait_for_load_state('networkidle', timeout=30000)
+                counter.seconds += time.perf_counter() - start
+
+                for _ in range(self.MAX_CLICKS):
+                    listings = [item for item in tab.evaluate(BAT_DOM_LISTINGS_SCRIPT)
+                                if item['id'] not in seen_ids]
+                    seen_ids.update(item['id'] for item in listings)
+                    counter.items_out += 1
+                    yield page, listings
+
+                    # Load the next batch with "Show More"
+                    try:
+                        show_more = tab.locator('button:has-text("Show More")').first
+                        if not show_more.is_visible():
+                            print('  No more "Show More" button visible')
+                            break
+                        counter.items_in += 1
+                        start = time.perf_counter()
+                        show_more.click()
+                        time.sleep(1.5)  # Wait for new content to load
+                        tab.wait_for_load_state('networkidle', timeout=10000)
+                        counter.seconds += time.perf_counter() - start
+                    except Exception as e:
+                        print(f'  Could not click Show More: {e}')
+                        break
+            finally:
+                browser.close()
+
+    def extract(self, page, body):
+        if page.kind == 'dom':
+            return body  # Already pulled out of the rendered page
+        return extract_bat_data_from_html(body)
+
+    def parse(self, item):
+        title = item.get('title', '')
+        if not item.get('thumbnail_url'):
+            return None
+        return {
+            'id': f"bat-{item.get('id', '') or stable_listing_id(title)}",
+            'title': title,
+            'imageUrl': re.sub(r'\?resize=\d+%2C\d+', '?resize=800%2C600', item['thumbnail_url']),
+            'auctionUrl': item.get('url', ''),
+        }
+
+
+class CabScriptDataExtractor(HTMLParser):
+    """Collect embedded JSON listing data from C&B script tags.
+
+    Script bodies are handed over by the parser as they are closed, so the
+    page is walked once and no regex ever runs across a whole inline bundle.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.items = []
+        self._in_script = False
+        self._script_is_json = False
+        self._script_parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'script':
+            self._in_script = True
+            self._script_is_json = 'json' in (dict(attrs).get('type') or '')
+            self._script_parts = []
+
+    def handle_data(self, data):
+        if self._in_script:
+            self._script_parts.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'script' and self._in_script:
+            self._in_script = False
+            if not self.items:
+                script = ''.join(self._script_parts)
+                self.items = find_cab_listings_in_script(script, self._script_is_json)
+            self._script_parts = []
+
+
+def find_cab_listing_array(data):
+    """Walk decoded JSON and return the first list of titled listing dicts."""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            if node and all(isinstance(x, dict) and 'title' in x for x in node):
+                return node
+            stack.extend(node)
+    return []
+
+
+def find_cab_listings_in_script(script, is_json=False):
+    """Decode listing data from a single script body.
+
+    JSON script tags are decoded whole; otherwise the value following each
+    "auctions" key is decoded in place with raw_decode, until the decoding
+    has worked through MAX_SCAN_FACTOR times the script's length.
+    """
+    decoder = json.JSONDecoder()
+
+    if is_json:
+        try:
+            data, _ = decoder.raw_decode(script.strip())
+            return find_cab_listing_array(data)
+        except (ValueError, RecursionError):
+            return []
+
+    if '"auctions"' not in script:
+        return []
+
+    budget = MAX_SCAN_FACTOR * len(script)
+    pos = 0
+    while budget > 0:
+        key_idx = script.find('"auctions"', pos)
+        if key_idx == -1:
+            break
+        pos = key_idx + len('"auctions"')
+
+        # Skip to the value after the colon
+        match = JSON_KEY_SEPARATOR.match(script, pos)
+        if not match:
+            continue
+        try:
+            data, end = decoder.raw_decode(script, match.end())
+        except ValueError as e:
+            error_pos = getattr(e, 'pos', len(script))
+            budget -= error_pos - match.end() + error_pos // ERROR_SCAN_DISCOUNT
+            continue
+        except RecursionError:
+            # Nested too deep to tell how far it got; assume the whole rest
+            budget -= len(script) - match.end()
+            continue
+
+        listings = find_cab_listing_array(data)
+        if listings:
+            return listings
+        budget -= end - match.end()
+        pos = end
+
+    return []
+
+
+def extract_cab_data_from_html(html):
+    """Extract car data from C&B HTML page."""
+    extractor = CabScriptDataExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor.items
+
+
+class CarsAndBids(Source):
+    """Ended C&B auctions, from their API or else the past-auctions page."""
+
+    name = 'cars_and_bids'
+    label = 'Cars And Bids'
+    fetch_options = {'headers': BROWSER_HEADERS, 'timeout': 15, 'hedge_after': 5}
+
+    API_URL = 'https://carsandbids.com/api/auctions?status=ended&limit=50'
+    API_HEADERS = {
+        **BROWSER_HEADERS,
+        'Accept': 'application/json',
+        'Content-Type': 'application/json',
+        'Origin': 'https://carsandbids.com',
+        'Referer': 'https://carsandbids.com/past-auctions/',
+    }
+    HTML_URL = 'https://carsandbids.com/past-auctions/'
+    HTML_HEADERS = {
+        **BROWSER_HEADERS,
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    }
+
+    def pages(self, stats):
+        yield Page(self.API_URL, self.API_HEADERS, kind='api')
+        # If the API gave us nothing, try the page's embedded data
+        if not stats['dedupe'].items_out:
+            yield Page(self.HTML_URL, self.HTML_HEADERS, kind='html')
+
+    def extract(self, page, body):
+        if page.kind == 'html':
+            return extract_cab_data_from_html(body)
+        data = json.loads(body)
+        if isinstance(data, list):
+            return data
+        return data.get('auctions', []) or data.get('items', []) or data.get('data', [])
+
+    def parse(self, item):
+        title = item.get('title', '') or item.get('name', '') or ''
+
+        # Get image URL
+        image = ''
+        if item.get('primaryPhotoUrl'):
+            image = item['primaryPhotoUrl']
+        elif item.get('image'):
+            image = item['image']
+        elif item.get('photos') and len(item['photos']) > 0:
+            photo = item['photos'][0]
+            image = photo if isinstance(photo, str) else photo.get('url', '')
+        elif item.get('imageUrl'):
+            image = item['imageUrl']
+
+        if not image:
+            return None
+
+        slug = item.get('slug', '') or item.get('id', '')
+        return {
+            'id': f"cab-{slug or stable_listing_id(title)}",
+            'title': title,
+            'imageUrl': image,
+            'auctionUrl': f"https://carsandbids.com/auctions/{slug}" if slug else '',
+        }
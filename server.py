@@ -6,558 +6,190 @@ Serves car data from Bring A Trailer and Cars And Bids auctions
 
 import json
 import re
-import random
 import os
 from datetime import datetime
 from http.server import HTTPServer, SimpleHTTPRequestHandler
-from urllib.request import urlopen, Request
 from urllib.parse import parse_qs, urlparse
-from urllib.error import URLError, HTTPError
 import threading
 import time
 
-# Try to import Playwright for browser automation
-try:
-    from playwright.sync_api import sync_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
-    print("Playwright not available - using basic scraping (limited cars)")
+import profiling
+from car_index import CarIndex, normalize_filters
+from daily import DAILY_CAR_COUNT, DailyChallengeStore, seconds_until_tomorrow
+from makes import KNOWN_MAKES
+from profiling import span
+from suggest import DEFAULT_LIMIT, SuggestIndex
 
 PORT = int(os.environ.get('PORT', 3000))
 
+# While a refresh streams in, the indexes are rebuilt at most every
+# INDEX_REBUILD_INTERVAL seconds, and further apart when a rebuild is slow,
+# so rebuilding (which holds the GIL, ~60 ms per 2k cars) takes up at most
+# INDEX_REBUILD_SHARE of the time
+INDEX_REBUILD_INTERVAL = float(os.environ.get('INDEX_REBUILD_INTERVAL', 5))
+INDEX_REBUILD_SHARE = 0.01
+
 # Cache for scraped car data
 car_cache = {
-    'bring_a_trailer': [],
-    'cars_and_bids': [],
+    'sources': {},          # Source name (see scrape_worker.SOURCES) -> cars
     'last_updated': None
 }
 
-# Browser headers
-BROWSER_HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-    'Accept-Language': 'en-US,en;q=0.5',
-}
-
-# Known car makes for parsing
-KNOWN_MAKES = [
-    'Acura', 'Alfa Romeo', 'Aston Martin', 'Audi', 'Bentley', 'BMW', 'Bugatti',
-    'Buick', 'Cadillac', 'Chevrolet', 'Chevy', 'Chrysler', 'Citroën', 'Datsun',
-    'De Tomaso', 'Dodge', 'Ferrari', 'Fiat', 'Ford', 'Genesis', 'GMC', 'Honda',
-    'Hummer', 'Hyundai', 'Infiniti', 'Jaguar', 'Jeep', 'Kia', 'Lamborghini',
-    'Land Rover', 'Lexus', 'Lincoln', 'Lotus', 'Maserati', 'Mazda', 'McLaren',
-    'Mercedes-Benz', 'Mercedes', 'Mercury', 'Mini', 'Mitsubishi', 'Nissan',
-    'Oldsmobile', 'Pagani', 'Peugeot', 'Plymouth', 'Pontiac', 'Porsche', 'Ram',
-    'Renault', 'Rolls-Royce', 'Saab', 'Saturn', 'Scion', 'Subaru', 'Suzuki',
-    'Tesla', 'Toyota', 'Triumph', 'Volkswagen', 'VW', 'Volvo', 'AMC',
-    'American Motors', 'Austin-Healey', 'DeLorean', 'DeTomaso', 'Hudson',
-    'International', 'Kaiser', 'Nash', 'Packard', 'Shelby', 'Studebaker',
-    'Willys', 'MG', 'TVR', 'Lancia', 'Opel', 'Vauxhall', 'Seat', 'Skoda'
-]
-
-# Motorcycle-only makes (always filter these out)
-MOTORCYCLE_MAKES = [
-    'Harley-Davidson', 'Harley Davidson', 'Harley', 'Ducati', 'Kawasaki',
-    'Yamaha', 'Suzuki', 'Indian', 'Moto Guzzi', 'Aprilia', 'KTM', 'MV Agusta',
-    'Norton', 'BSA', 'Royal Enfield', 'Husqvarna', 'Benelli', 'Bimota',
-    'Buell', 'Victory', 'Can-Am', 'Ural', 'Zero', 'Confederate', 'Arch'
-]
-
-# Keywords that indicate a motorcycle (in title)
-MOTORCYCLE_KEYWORDS = ['motorcycle', 'motorbike', 'bike', 'scooter', 'moped']
-
-
-def is_motorcycle(title, make=None):
-    """Check if a listing is a motorcycle (should be filtered out)."""
-    title_lower = title.lower()
-
-    # Check for motorcycle keywords in title
-    for keyword in MOTORCYCLE_KEYWORDS:
-        if keyword in title_lower:
-            return True
-
-    # Check if make is a motorcycle-only brand
-    if make:
-        make_lower = make.lower()
-        for moto_make in MOTORCYCLE_MAKES:
-            if moto_make.lower() == make_lower or moto_make.lower() in make_lower:
-                return True
-
-    # Also check title for motorcycle makes
-    for moto_make in MOTORCYCLE_MAKES:
-        if moto_make.lower() in title_lower:
-            return True
-
-    return False
+# Stage counters from each source's latest scrape
+source_stats = {}
 
+# Facet indexes over get_all_cars(), swapped in whole as each scraped batch lands
+car_index = CarIndex([])
 
-def parse_car_title(title):
-    """Parse year, make, model from a car title."""
-    cleaned = ' '.join(title.split())
-    year_match = re.match(r'^(\d{4})\s+', cleaned)
+# Make/model typeahead, rebuilt alongside car_index
+suggest_index = SuggestIndex([], KNOWN_MAKES)
 
-    if not year_match:
-        return None
+# Multiplayer rooms, created by get_room_hub() on the first /api/rooms request
+room_hub = None
 
-    year = year_match.group(1)
-    rest = cleaned[len(year_match.group(0)):]
-
-    # Find make
-    make = None
-    model_start = 0
-
-    for known_make in KNOWN_MAKES:
-        if rest.lower().startswith(known_make.lower()):
-            make = known_make
-            model_start = len(known_make)
-            break
-
-    if not make:
-        first_space = rest.find(' ')
-        if first_space > 0:
-            make = rest[:first_space]
-            model_start = first_space
-        else:
-            make = rest
-            model_start = len(rest)
-
-    # Get model
-    model_part = rest[model_start:].strip()
-
-    # Remove common suffixes
-    suffix_patterns = [
-        r'\s+\d+-Speed$',
-        r'\s+Manual$',
-        r'\s+Automatic$',
-        r'\s+Auto$',
-        r'\s+Coupe$',
-        r'\s+Sedan$',
-        r'\s+Convertible$',
-        r'\s+Wagon$',
-        r'\s+Hatchback$',
-        r'\s+SUV$',
-        r'\s+Roadster$',
-        r'\s+Cabriolet$',
-        r'\s+Targa$',
-        r'\s+Spyder$',
-        r'\s+Spider$',
-    ]
-
-    for pattern in suffix_patterns:
-        model_part = re.sub(pattern, '', model_part, flags=re.IGNORECASE)
-
-    # Take first 2-3 words as model
-    model_words = [w for w in model_part.split() if w]
-    model = ' '.join(model_words[:3]).strip()
-
-    if not model:
-        model = model_words[0] if model_words else 'Unknown'
-
-    return {'year': year, 'make': make, 'model': model}
-
-
-def extract_bat_data_from_html(html):
-    """Extract car data from BaT HTML page."""
-    marker = 'auctionsCompletedInitialData = '
-    start_idx = html.find(marker)
-
-    if start_idx == -1:
-        return []
-
-    json_start = start_idx + len(marker)
-    brace_count = 0
-    json_end = json_start
-
-    for i, char in enumerate(html[json_start:]):
-        if char == '{':
-            brace_count += 1
-        elif char == '}':
-            brace_count -= 1
-            if brace_count == 0:
-                json_end = json_start + i + 1
-                break
+# Today's shared challenge, persisted so every process serves the same cars
+daily_challenges = DailyChallengeStore(get_cars=lambda: get_all_cars())
 
-    try:
-        data = json.loads(html[json_start:json_end])
-        return data.get('items', [])
-    except json.JSONDecodeError:
-        return []
+# Set once the server socket is bound and accepting connections
+server_ready = threading.Event()
 
+# Set to ask the refresh thread for an early refresh
+refresh_requested = threading.Event()
+refresh_in_progress = threading.Event()
 
-def scrape_bring_a_trailer(max_cars=500):
-    """Scrape car data from Bring A Trailer using multiple URL variations.
+# Set once a refresh has run to the end, so the cache holds every source
+cache_loaded = threading.Event()
 
-    Args:
-        max_cars: Maximum number of cars to collect
 
-    Note: BaT's embedded data is limited, but we try multiple URLs to maximize variety.
+def refresh_cache():
+    """Refresh the car cache.
+
+    Scraping runs in worker processes (see scrape_worker), every source at
+    once; this process only waits on their pipes. Each batch is merged in
+    as it arrives and the indexes are rebuilt with the first batch, then
+    now and again (see INDEX_REBUILD_INTERVAL) and once at the end, so the
+    game has cars within seconds of startup. Old cars stay until their
+    source finishes, and a source whose worker fails (or finds nothing)
+    keeps its previous cars.
     """
-    try:
-        print('Scraping Bring A Trailer...')
-        all_cars = []
-        seen_ids = set()
-
-        # URLs to try - different filters/pages to maximize unique cars
-        urls_to_try = [
-            'https://bringatrailer.com/auctions/results/',
-            'https://bringatrailer.com/auctions/results/?page=2',
-            'https://bringatrailer.com/auctions/results/?page=3',
-            'https://bringatrailer.com/auctions/results/?era=1980s',
-            'https://bringatrailer.com/auctions/results/?era=1990s',
-            'https://bringatrailer.com/auctions/results/?era=2000s',
-            'https://bringatrailer.com/auctions/results/?era=2010s',
-            'https://bringatrailer.com/auctions/results/?era=1970s',
-            'https://bringatrailer.com/auctions/results/?era=1960s',
-            'https://bringatrailer.com/auctions/results/?origin=american',
-            'https://bringatrailer.com/auctions/results/?origin=japanese',
-            'https://bringatrailer.com/auctions/results/?origin=german',
-            'https://bringatrailer.com/auctions/results/?origin=british',
-            'https://bringatrailer.com/auctions/results/?origin=italian',
-        ]
-
-        for url in urls_to_try:
-            if len(all_cars) >= max_cars:
-                break
-
-            try:
-                req = Request(url, headers=BROWSER_HEADERS)
-                with urlopen(req, timeout=30) as response:
-                    html = response.read().decode('utf-8')
-
-                listings = extract_bat_data_from_html(html)
-
-                # Parse and dedupe
-                new_count = 0
-                for item in listings:
-                    bat_id = item.get('id', '')
-                    if bat_id and bat_id not in seen_ids:
-                        seen_ids.add(bat_id)
-                        car = parse_bat_listing_item(item)
-                        if car:
-                            all_cars.append(car)
-                            new_count += 1
-
-                if new_count > 0:
-                    print(f'  {url.split("?")[-1] if "?" in url else "base"}: +{new_count} new (total: {len(all_cars)})')
-
-                time.sleep(0.2)
+    import scrape_worker
 
-            except Exception as e:
-                print(f'  Error fetching {url}: {e}')
-
-        print(f'Found {len(all_cars)} unique cars from Bring A Trailer')
-        return all_cars
-
-    except Exception as e:
-        print(f'Error scraping BaT: {e}')
-        return []
-
-
-def parse_bat_listing_item(item):
-    """Parse a single BaT listing item into a car object."""
-    title = item.get('title', '')
-    parsed = parse_car_title(title)
-
-    if not parsed or not item.get('thumbnail_url'):
-        return None
-
-    # Filter out motorcycles
-    if is_motorcycle(title, parsed.get('make')):
-        return None
-
-    image_url = re.sub(r'\?resize=\d+%2C\d+', '?resize=800%2C600', item['thumbnail_url'])
-    bat_id = item.get('id', '') or str(hash(title))[:8]
-
-    return {
-        'id': f"bat-{bat_id}",
-        'source': 'Bring A Trailer',
-        'title': title,
-        'year': parsed['year'],
-        'make': parsed['make'],
-        'model': parsed['model'],
-        'imageUrl': image_url,
-        'auctionUrl': item.get('url', '')
-    }
-
-
-def scrape_bat_with_playwright(target_cars=500):
-    """Scrape BaT using Playwright browser automation for more cars.
-
-    Args:
-        target_cars: Target number of cars to collect
-    """
-    if not PLAYWRIGHT_AVAILABLE:
-        print("Playwright not available, falling back to basic scraping")
-        return scrape_bring_a_trailer()
-
-    print(f'Scraping Bring A Trailer with Playwright (target: {target_cars} cars)...')
-    all_cars = []
-    seen_ids = set()
-
-    def extract_listings_from_dom(page):
-        """Extract listing data directly from DOM elements."""
-        return page.evaluate('''() => {
-            const items = [];
-            const links = document.querySelectorAll('a[href*="/listing/"]');
-            const seen = new Set();
-
-            links.forEach(link => {
-                const href = link.href;
-                if (seen.has(href)) return;
-                seen.add(href);
-
-                // Get title from h3 or title class
-                const titleEl = link.querySelector('h3, .title, [class*="title"]');
-                let title = titleEl?.textContent?.trim() || '';
-
-                // If no title element, try the link text itself
-                if (!title) {
-                    title = link.textContent?.trim() || '';
-                }
-
-                // Get image
-                const img = link.querySelector('img') || link.parentElement?.querySelector('img');
-                const imgUrl = img?.src || img?.dataset?.src || '';
-
-                // Get ID from URL
-                const match = href.match(/listing\\/([^/]+)/);
-                const id = match ? match[1] : '';
-
-                // Only include if title starts with a year
-                if (title && title.match(/^\\d{4}/) && imgUrl && id) {
-                    items.push({
-                        title: title,
-                        thumbnail_url: imgUrl,
-                        id: id,
-                        url: href
-                    });
-                }
-            });
-
-            return items;
-        }''')
+    print('Refreshing car cache...')
+    trace = profiling.start_trace('refresh')
+    refresh_in_progress.set()
+    scraped = {}
+    worker_stats = {}
+    next_rebuild = 0.0
+
+    def publish(source, cars):
+        nonlocal next_rebuild
+        fresh = scraped.setdefault(source, {})
+        for car in cars:
+            fresh[car['id']] = car
+        previous = [car for car in car_cache['sources'].get(source, []) if car['id'] not in fresh]
+        # Swapped in whole: request handlers iterate the dict while this runs
+        car_cache['sources'] = {**car_cache['sources'], source: list(fresh.values()) + previous}
+        car_cache['last_updated'] = datetime.now().isoformat()
+        if time.monotonic() >= next_rebuild:
+            start = time.monotonic()
+            with span('index'):
+                rebuild_index()
+            elapsed = time.monotonic() - start
+            next_rebuild = start + max(INDEX_REBUILD_INTERVAL, elapsed / INDEX_REBUILD_SHARE)
+
+    def record_stats(source, stats):
+        source_stats[source] = stats
+        worker_stats[source] = stats
 
     try:
-        with sync_playwright() as p:
-            # Launch headless browser
-            print('  Launching browser...')
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-            )
-            page = context.new_page()
-
-            # Go to results page
-            print('  Loading BaT auction results page...')
-            page.goto('https://bringatrailer.com/auctions/results/', timeout=60000)
-            page.wait_for_load_state('networkidle', timeout=30000)
-
-            # Click "Show More" button repeatedly to load more cars
-            max_clicks = 20  # Each click loads ~20 more cars
-
-            for click_num in range(max_clicks):
-                # Extract current listings from DOM
-                listings_data = extract_listings_from_dom(page)
-
-                # Parse new listings
-                new_count = 0
-                for item in listings_data:
-                    bat_id = str(item.get('id', ''))
-                    if bat_id and bat_id not in seen_ids:
-                        seen_ids.add(bat_id)
-                        car = parse_bat_listing_item(item)
-                        if car:
-                            all_cars.append(car)
-                            new_count += 1
-
-                print(f'  After click {click_num}: {len(all_cars)} total cars (+{new_count} new)')
-
-                if len(all_cars) >= target_cars:
-                    print(f'  Reached target of {target_cars} cars!')
-                    break
-
-                # Try to click "Show More" button
-                try:
-                    show_more = page.locator('button:has-text("Show More")').first
-                    if show_more.is_visible():
-                        show_more.click()
-                        time.sleep(1.5)  # Wait for new content to load
-                        page.wait_for_load_state('networkidle', timeout=10000)
-                    else:
-                        print('  No more "Show More" button visible')
-                        break
-                except Exception as e:
-                    print(f'  Could not click Show More: {e}')
-                    break
-
-            browser.close()
-
-    except Exception as e:
-        print(f'Playwright error: {e}')
-        print('Falling back to basic scraping...')
-        return scrape_bring_a_trailer()
-
-    print(f'Found {len(all_cars)} total cars from Bring A Trailer (Playwright)')
-    return all_cars
-
-
-def scrape_cars_and_bids():
-    """Scrape car data from Cars And Bids API."""
-    try:
-        print('Scraping Cars And Bids...')
-
-        # Try their GraphQL/API endpoint
-        api_headers = {
-            **BROWSER_HEADERS,
-            'Accept': 'application/json',
-            'Content-Type': 'application/json',
-            'Origin': 'https://carsandbids.com',
-            'Referer': 'https://carsandbids.com/past-auctions/',
+        with span('workers'):
+            results = scrape_worker.scrape_sources(on_batch=publish, on_stats=record_stats)
+
+        # The stages run inside the workers, so their spans come from each
+        # source's final counters (summed over sources, like in-process spans)
+        if trace is not None:
+            for stats in worker_stats.values():
+                for stage, counts in stats['stages'].items():
+                    trace.add(stage, counts['seconds'])
+
+        car_cache['sources'] = {
+            **car_cache['sources'],
+            **{source: cars for source, cars in results.items() if cars},
         }
-
-        # Try the search API
-        api_url = 'https://carsandbids.com/api/auctions?status=ended&limit=50'
-        req = Request(api_url, headers=api_headers)
-
-        cars = []
-        try:
-            with urlopen(req, timeout=30) as response:
-                data = json.loads(response.read().decode('utf-8'))
-
-            auctions = data if isinstance(data, list) else data.get('auctions', []) or data.get('items', []) or data.get('data', [])
-
-            for item in auctions:
-                title = item.get('title', '') or item.get('name', '') or ''
-                parsed = parse_car_title(title)
-
-                # Get image URL
-                image = ''
-                if item.get('primaryPhotoUrl'):
-                    image = item['primaryPhotoUrl']
-                elif item.get('image'):
-                    image = item['image']
-                elif item.get('photos') and len(item['photos']) > 0:
-                    image = item['photos'][0].get('url', '')
-                elif item.get('imageUrl'):
-                    image = item['imageUrl']
-
-                if parsed and image:
-                    slug = item.get('slug', '') or item.get('id', '')
-                    cars.append({
-                        'id': f"cab-{slug}",
-                        'source': 'Cars And Bids',
-                        'title': title,
-                        'year': parsed['year'],
-                        'make': parsed['make'],
-                        'model': parsed['model'],
-                        'imageUrl': image,
-                        'auctionUrl': f"https://carsandbids.com/auctions/{slug}"
-                    })
-        except Exception as e:
-            print(f'API request failed: {e}')
-
-        # If API fails, try HTML scraping as fallback
-        if not cars:
-            try:
-                html_headers = {
-                    **BROWSER_HEADERS,
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                }
-                req = Request('https://carsandbids.com/past-auctions/', headers=html_headers)
-                with urlopen(req, timeout=30) as response:
-                    html = response.read().decode('utf-8')
-
-                # Look for JSON data in script tags
-                script_pattern = re.compile(r'<script[^>]*>([\s\S]*?)</script>')
-                for match in script_pattern.finditer(html):
-                    script = match.group(1)
-                    if '"auctions"' in script or '"title"' in script:
-                        # Try to find JSON arrays
-                        try:
-                            array_match = re.search(r'\[[\s\S]*?"title"\s*:\s*"[^"]+[\s\S]*?\]', script)
-                            if array_match:
-                                items = json.loads(array_match.group(0))
-                                for item in items:
-                                    title = item.get('title', '')
-                                    image = item.get('image', '') or item.get('primaryPhotoUrl', '')
-                                    parsed = parse_car_title(title)
-                                    if parsed and image:
-                                        cars.append({
-                                            'id': f"cab-{hash(title) % 100000}",
-                                            'source': 'Cars And Bids',
-                                            'title': title,
-                                            'year': parsed['year'],
-                                            'make': parsed['make'],
-                                            'model': parsed['model'],
-                                            'imageUrl': image,
-                                            'auctionUrl': ''
-                                        })
-                        except:
-                            pass
-            except Exception as e:
-                print(f'HTML scraping failed: {e}')
-
-        print(f'Found {len(cars)} cars from Cars And Bids')
-        return cars
-
-    except Exception as e:
-        print(f'Error scraping C&B: {e}')
-        return []
-
-
-def refresh_cache():
-    """Refresh the car cache."""
-    print('Refreshing car cache...')
-    global car_cache
-
-    # Load cars from BaT using Playwright for more results
-    if PLAYWRIGHT_AVAILABLE:
-        bat_cars = scrape_bat_with_playwright(target_cars=1000)
-    else:
-        bat_cars = scrape_bring_a_trailer(max_cars=1000)
-    cab_cars = scrape_cars_and_bids()
-
-    car_cache['bring_a_trailer'] = bat_cars
-    car_cache['cars_and_bids'] = cab_cars
-    car_cache['last_updated'] = datetime.now().isoformat()
-
-    print(f'Cache refreshed: {len(bat_cars)} BaT, {len(cab_cars)} C&B cars')
+        car_cache['last_updated'] = datetime.now().isoformat()
+
+        with span('index'):
+            rebuild_index()
+        cache_loaded.set()
+    finally:
+        refresh_in_progress.clear()
+        profiling.finish_trace(trace)
+
+    print('Cache refreshed: ' + ', '.join(
+        f'{len(cars)} {source}' for source, cars in car_cache['sources'].items()
+    ))
+
+
+def get_room_hub():
+    """The rooms hub. rooms (and asyncio) are only imported once a room
+    request comes in; the event loop thread starts with the first room."""
+    global room_hub
+    if room_hub is None:
+        from rooms import RoomHub
+        room_hub = RoomHub(
+            pick_cars=lambda count, filters: get_competition_cars(count, filters),
+            score=lambda car, year, make, model: check_answer(car, year, make, model)
+        )
+    return room_hub
+
+
+def get_daily_challenge():
+    """Today's challenge, or None.
+
+    While the first refresh is still streaming in, the cache holds only the
+    first pages of each source, so a new day's set isn't picked until it
+    finishes (one another process already saved is still served).
+    """
+    if refresh_in_progress.is_set() and not cache_loaded.is_set():
+        return daily_challenges.peek()
+    return daily_challenges.get()
 
 
 def get_all_cars():
     """Get all cars from cache."""
-    return car_cache['bring_a_trailer'] + car_cache['cars_and_bids']
+    return [car for cars in car_cache['sources'].values() for car in cars]
 
 
-def get_random_car():
-    """Get a random car."""
-    all_cars = get_all_cars()
-    if not all_cars:
-        return None
-    return random.choice(all_cars)
+def rebuild_index():
+    """Rebuild the facet and typeahead indexes from the current cache."""
+    global car_index, suggest_index
+    cars = get_all_cars()
+    car_index = CarIndex(cars)
+    suggest_index = SuggestIndex(cars, KNOWN_MAKES)
 
 
-def get_competition_cars(count=10):
-    """Get unique cars for competition (no duplicate make+model)."""
-    all_cars = get_all_cars()
-    if len(all_cars) < count:
-        return all_cars
+def get_car(car_id):
+    """Get a car by id, or None."""
+    return car_index.by_id.get(car_id)
 
-    selected = []
-    used_make_models = set()
-    shuffled = all_cars.copy()
-    random.shuffle(shuffled)
 
-    for car in shuffled:
-        key = f"{car['make'].lower()}-{car['model'].lower()}"
-        if key not in used_make_models:
-            used_make_models.add(key)
-            selected.append(car)
-            if len(selected) >= count:
-                break
+def get_random_car(filters=(), attempts=8):
+    """Get a random car, optionally matching facet filters.
+
+    Today's daily cars are skipped; they are only scored through
+    /api/daily/result.
+    """
+    for _ in range(attempts):
+        car = car_index.random_car(filters)
+        if not car or not daily_challenges.is_daily_car(car['id']):
+            return car
+    return None
 
-    return selected
+
+def get_competition_cars(count=10, filters=()):
+    """Get unique cars for competition (no duplicate make+model, no daily cars)."""
+    cars = car_index.competition_cars(count + DAILY_CAR_COUNT, filters)
+    return [car for car in cars if not daily_challenges.is_daily_car(car['id'])][:count]
 
 
 def normalize_string(s):
@@ -583,6 +215,10 @@ def fuzzy_match(user_input, correct_answer):
     user_norm = normalize_string(user_input)
     correct_norm = normalize_string(correct_answer)
 
+    # A blank guess (or one that's all punctuation) matches nothing
+    if not user_norm:
+        return False
+
     # Exact match after normalization
     if user_norm == correct_norm:
         return True
@@ -594,6 +230,51 @@ def fuzzy_match(user_input, correct_answer):
     return False
 
 
+def check_answer(car, year, make, model):
+    """Score a guess against a car and build the check-answer response."""
+    # Calculate year difference and points (exponential decay)
+    try:
+        year_diff = abs(int(year) - int(car['year']))
+    except (ValueError, TypeError, OverflowError):
+        year_diff = 99  # Invalid year input
+
+    year_exact = year_diff == 0
+    # Exponential decay: exact=25, ±1=15, ±2=5, ±3+=0
+    year_points_map = {0: 25, 1: 15, 2: 5}
+    year_points = year_points_map.get(year_diff, 0)
+
+    # Guesses come straight from request JSON and may not be strings
+    make_correct = fuzzy_match(str(make), car['make'])
+    model_correct = fuzzy_match(str(model), car['model'])
+
+    # Calculate score
+    score = 0
+    if make_correct:
+        score += 10
+    score += year_points  # 0-25 based on distance
+    if model_correct:
+        score += 50
+    # Bonus only for perfect answers (year must be exact)
+    if make_correct and year_exact and model_correct:
+        score += 25
+
+    return {
+        'yearCorrect': year_exact,  # True only if exact match
+        'yearDiff': year_diff,
+        'yearPoints': year_points,
+        'makeCorrect': make_correct,
+        'modelCorrect': model_correct,
+        'score': score,
+        'correctAnswer': {
+            'year': car['year'],
+            'make': car['make'],
+            'model': car['model'],
+            'title': car['title'],
+            'auctionUrl': car['auctionUrl']
+        }
+    }
+
+
 class GameHandler(SimpleHTTPRequestHandler):
     """HTTP request handler for the game."""
 
@@ -605,9 +286,28 @@ class GameHandler(SimpleHTTPRequestHandler):
         parsed = urlparse(self.path)
         path = parsed.path
 
-        if path == '/api/random-car':
-            car = get_random_car()
-            if not car:
+        if path.startswith('/api/debug/'):
+            self.handle_debug(path, parse_qs(parsed.query))
+            return
+
+        trace = profiling.start_trace(f'GET {path}')
+        try:
+            self.handle_get(path, parse_qs(parsed.query))
+        finally:
+            profiling.finish_trace(trace)
+
+    def handle_get(self, path, query):
+        """Route a GET request."""
+        if path.startswith('/api/rooms/'):
+            self.handle_rooms(path, query)
+
+        elif path == '/api/random-car':
+            filters = normalize_filters(query)
+            with span('car_lookup'):
+                car = get_random_car(filters)
+            if not car and filters:
+                self.send_json({'error': 'No cars match those filters.'}, 404)
+            elif not car:
                 self.send_json({'error': 'No cars available. Please try again later.'}, 503)
             else:
                 self.send_json({
@@ -617,8 +317,12 @@ class GameHandler(SimpleHTTPRequestHandler):
                 })
 
         elif path == '/api/competition-cars':
-            cars = get_competition_cars(10)
-            if len(cars) < 10:
+            filters = normalize_filters(query)
+            with span('car_lookup'):
+                cars = get_competition_cars(10, filters)
+            if len(cars) < 10 and filters:
+                self.send_json({'error': 'Not enough cars match those filters.'}, 404)
+            elif len(cars) < 10:
                 self.send_json({'error': 'Not enough cars available. Please try again later.'}, 503)
             else:
                 self.send_json([{
@@ -628,13 +332,47 @@ class GameHandler(SimpleHTTPRequestHandler):
                 } for c in cars])
 
         elif path == '/api/status':
+            sources = car_cache['sources']
             self.send_json({
-                'bringATrailerCount': len(car_cache['bring_a_trailer']),
-                'carsAndBidsCount': len(car_cache['cars_and_bids']),
+                'bringATrailerCount': len(sources.get('bring_a_trailer', [])),
+                'carsAndBidsCount': len(sources.get('cars_and_bids', [])),
+                'sources': {
+                    source: {
+                        'label': cars[0]['source'] if cars else source,
+                        'cars': len(cars),
+                        'pipeline': source_stats.get(source),
+                    } for source, cars in sources.items()
+                },
                 'totalCars': len(get_all_cars()),
-                'lastUpdated': car_cache['last_updated']
+                'lastUpdated': car_cache['last_updated'],
+                'refreshing': refresh_in_progress.is_set() or refresh_requested.is_set()
             })
 
+        elif path == '/api/daily':
+            challenge = get_daily_challenge()
+            if not challenge:
+                self.send_json({'error': 'Not enough cars available. Please try again later.'}, 503)
+            else:
+                self.send_daily(challenge)
+
+        elif path == '/api/filters':
+            self.send_json(car_index.facet_counts())
+
+        elif path == '/api/suggest':
+            field = query.get('field', ['make'])[0]
+            try:
+                limit = int(query.get('limit', [DEFAULT_LIMIT])[0])
+            except ValueError:
+                limit = DEFAULT_LIMIT
+            if field not in ('make', 'model'):
+                self.send_json({'error': 'field must be make or model'}, 400)
+            else:
+                with span('suggest'):
+                    suggestions = suggest_index.suggest(
+                        field, query.get('q', [''])[0][:50], query.get('make', [''])[0][:50], limit
+                    )
+                self.send_json({'field': field, 'suggestions': list(suggestions)})
+
         else:
             # Serve static files
             if path == '/':
@@ -646,82 +384,240 @@ class GameHandler(SimpleHTTPRequestHandler):
         parsed = urlparse(self.path)
         path = parsed.path
 
-        if path == '/api/check-answer':
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+        if path.startswith('/api/debug/'):
+            self.handle_debug(path, parse_qs(parsed.query))
+            return
+
+        trace = profiling.start_trace(f'POST {path}')
+        try:
+            self.handle_post(path, parse_qs(parsed.query))
+        finally:
+            profiling.finish_trace(trace)
+
+    def handle_post(self, path, query):
+        """Route a POST request."""
+        if path == '/api/rooms' or path.startswith('/api/rooms/'):
+            self.handle_rooms(path, query)
+
+        elif path == '/api/daily/result':
+            challenge = get_daily_challenge()
+            data = self.read_json()
+            answers = data.get('answers', []) if data is not None else None
+            if not isinstance(answers, list) or not all(isinstance(a, dict) for a in answers):
+                self.send_json({'error': 'Expected {"date", "answers": [{"carId", "year", "make", "model"}]}'}, 400)
+            elif not challenge:
+                self.send_json({'error': 'Not enough cars available. Please try again later.'}, 503)
+            elif challenge.date.isoformat() != data.get('date', challenge.date.isoformat()):
+                self.send_json({'error': 'That daily challenge has ended.'}, 409)
+            else:
+                with span('scoring'):
+                    result = challenge.summarize(answers, check_answer)
+                self.send_json(result)
+
+        elif path == '/api/check-answer':
+            data = self.read_json()
+            if data is None:
+                self.send_json({'error': 'Expected a JSON object'}, 400)
+                return
 
             car_id = data.get('carId')
             year = data.get('year', '')
             make = data.get('make', '')
             model = data.get('model', '')
 
-            all_cars = get_all_cars()
-            car = next((c for c in all_cars if c['id'] == car_id), None)
+            if not isinstance(car_id, str):
+                self.send_json({'error': 'carId must be a string'}, 400)
+                return
+
+            if daily_challenges.is_daily_car(car_id):
+                self.send_json({'error': "Today's daily cars are scored with /api/daily/result"}, 403)
+                return
+
+            with span('car_lookup'):
+                car = get_car(car_id)
 
             if not car:
                 self.send_json({'error': 'Car not found'}, 404)
                 return
 
-            # Calculate year difference and points (exponential decay)
-            try:
-                year_diff = abs(int(year) - int(car['year']))
-            except (ValueError, TypeError):
-                year_diff = 99  # Invalid year input
-
-            year_exact = year_diff == 0
-            # Exponential decay: exact=25, ±1=15, ±2=5, ±3+=0
-            year_points_map = {0: 25, 1: 15, 2: 5}
-            year_points = year_points_map.get(year_diff, 0)
-
-            make_correct = fuzzy_match(make, car['make'])
-            model_correct = fuzzy_match(model, car['model'])
-
-            # Calculate score
-            score = 0
-            if make_correct:
-                score += 10
-            score += year_points  # 0-25 based on distance
-            if model_correct:
-                score += 50
-            # Bonus only for perfect answers (year must be exact)
-            if make_correct and year_exact and model_correct:
-                score += 25
+            with span('scoring'):
+                result = check_answer(car, year, make, model)
 
-            self.send_json({
-                'yearCorrect': year_exact,  # True only if exact match
-                'yearDiff': year_diff,
-                'yearPoints': year_points,
-                'makeCorrect': make_correct,
-                'modelCorrect': model_correct,
-                'score': score,
-                'correctAnswer': {
-                    'year': car['year'],
-                    'make': car['make'],
-                    'model': car['model'],
-                    'title': car['title'],
-                    'auctionUrl': car['auctionUrl']
-                }
-            })
+            self.send_json(result)
 
         elif path == '/api/refresh':
-            refresh_cache()
+            # Runs on the refresh thread; poll /api/status for completion
+            refresh_requested.set()
             self.send_json({
                 'success': True,
+                'refreshing': True,
                 'totalCars': len(get_all_cars()),
                 'lastUpdated': car_cache['last_updated']
-            })
+            }, 202)
 
         else:
             self.send_error(404)
 
     def send_json(self, data, status=200):
         """Send JSON response."""
+        with span('serialize'):
+            body = json.dumps(data).encode('utf-8')
+
         self.send_response(status)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        trace = profiling.current_trace()
+        if trace is not None:
+            self.send_header('Server-Timing', trace.server_timing())
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_daily(self, challenge):
+        """Send the pre-encoded daily payload, or 304 if the client has it."""
+        not_modified = self.headers.get('If-None-Match') == challenge.etag
+
+        self.send_response(304 if not_modified else 200)
+        self.send_header('ETag', challenge.etag)
+        self.send_header('Cache-Control', f'public, max-age={seconds_until_tomorrow()}')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if not not_modified:
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(challenge.body)))
+        self.end_headers()
+
+        if not not_modified:
+            self.wfile.write(challenge.body)
+
+    def read_json(self):
+        """Read a JSON object request body ({} if there is none, None if it
+        isn't a JSON object)."""
+        try:
+            content_length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            return None
+        if not content_length:
+            return {}
+        with span('json_parse'):
+            try:
+                data = json.loads(self.rfile.read(content_length).decode('utf-8'))
+            except ValueError:
+                return None
+        return data if isinstance(data, dict) else None
+
+    def handle_rooms(self, path, query):
+        """Multiplayer room endpoints (see rooms.py)."""
+        import rooms
+
+        hub = get_room_hub()
+        parts = path.strip('/').split('/')[2:]  # after /api/rooms
+        data = self.read_json() if self.command == 'POST' else {}
+        if data is None:
+            self.send_json({'error': 'Expected a JSON object'}, 400)
+            return
+
+        try:
+            if self.command == 'POST' and not parts:
+                self.send_json(hub.create_room(
+                    data.get('roundSeconds', rooms.ROUND_SECONDS), normalize_filters(query)), 201)
+
+            elif self.command == 'GET' and len(parts) == 1:
+                self.send_json(hub.snapshot(parts[0]))
+
+            elif self.command == 'GET' and parts[1:] == ['events']:
+                self.open_room_events(hub, parts[0], query.get('playerId', [''])[0])
+
+            elif self.command == 'POST' and parts[1:] == ['join']:
+                self.send_json(hub.join(parts[0], str(data.get('name', ''))))
+
+            elif self.command == 'POST' and parts[1:] == ['start']:
+                self.send_json(hub.start(parts[0]))
+
+            elif self.command == 'POST' and parts[1:] == ['answer']:
+                with span('scoring'):
+                    result = hub.answer(
+                        parts[0], data.get('playerId'), data.get('carId'),
+                        data.get('year', ''), data.get('make', ''), data.get('model', ''))
+                self.send_json(result)
+
+            else:
+                self.send_error(404)
+
+        except rooms.RoomError as e:
+            self.send_json({'error': str(e)}, e.status)
+
+    def open_room_events(self, hub, room_id, player_id):
+        """Send SSE headers, then hand the socket to the rooms event loop."""
+        hub.check_player(room_id, player_id)  # 404 before committing to a stream
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.flush()
+
+        self.close_connection = True
+        self.server.detached_requests.add(self.connection)
+        hub.subscribe(room_id, player_id, self.connection)
+
+    def send_bytes(self, body, content_type, status=200):
+        """Send a raw response body."""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_debug(self, path, query):
+        """Developer profiling endpoints (need CARGAME_PROFILING and a token)."""
+        if not profiling.ENABLED:
+            self.send_error(404)
+            return
+        if not profiling.check_token(self.headers.get('X-Profile-Token')):
+            self.send_json({'error': 'Invalid profile token'}, 403)
+            return
+
+        def param(name, default=''):
+            return query.get(name, [default])[0]
+
+        if path == '/api/debug/profile/start' and self.command == 'POST':
+            try:
+                session = profiling.start_session(
+                    param('mode', 'cprofile'), float(param('interval', '0.005')))
+            except (ValueError, RuntimeError) as e:
+                self.send_json({'error': str(e)}, 400)
+                return
+            self.send_json(session.to_dict())
+
+        elif path == '/api/debug/profile/stop' and self.command == 'POST':
+            try:
+                session = profiling.stop_session()
+            except RuntimeError as e:
+                self.send_json({'error': str(e)}, 400)
+                return
+            self.send_json(session.to_dict())
+
+        elif path == '/api/debug/profile/stats' and self.command == 'GET':
+            session = profiling.get_session()
+            if not session or session.stopped_at is None:
+                self.send_json({'error': 'No finished profiling session'}, 404)
+                return
+            content_type, body = session.stats(param('format', 'text'))
+            self.send_bytes(body, content_type)
+
+        elif path == '/api/debug/trace' and self.command == 'POST':
+            profiling.tracing = param('enabled', '1') == '1'
+            self.send_json({'tracing': profiling.tracing})
+
+        elif path == '/api/debug/traces' and self.command == 'GET':
+            self.send_json({
+                'tracing': profiling.tracing,
+                'traces': list(profiling.recent_traces)
+            })
+
+        else:
+            self.send_error(404)
 
     def do_OPTIONS(self):
         """Handle CORS preflight."""
@@ -737,28 +633,52 @@ class GameHandler(SimpleHTTPRequestHandler):
             print(f"[{datetime.now().strftime('%H:%M:%S')}] {args[0]}")
 
 
+class GameServer(HTTPServer):
+    """HTTP server that can hand accepted sockets over to the rooms loop."""
+
+    # Room starts bring bursts of players connecting at once
+    request_queue_size = 128
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.detached_requests = set()
+
+    def shutdown_request(self, request):
+        # Detached sockets now belong to the rooms event loop
+        if request in self.detached_requests:
+            self.detached_requests.discard(request)
+            return
+        super().shutdown_request(request)
+
+
 def cache_refresh_thread():
-    """Background thread to refresh cache periodically."""
+    """Background thread to load the cache, then refresh it periodically."""
     while True:
-        time.sleep(30 * 60)  # 30 minutes
-        refresh_cache()
+        try:
+            refresh_cache()
+        except Exception as e:
+            # e.g. no memory to spawn a worker; keep the cache and try again later
+            print(f'Cache refresh failed: {type(e).__name__}: {e}')
+        refresh_requested.wait(timeout=30 * 60)  # 30 minutes, or on request
+        refresh_in_progress.set()  # Keep /api/status reporting the refresh
+        refresh_requested.clear()
 
 
-if __name__ == '__main__':
+def main(port=PORT):
+    """Bind the server, then load cars in the background and serve forever."""
     print('=' * 50)
     print('Car Guess Game Server')
     print('=' * 50)
 
-    # Initial cache refresh
-    refresh_cache()
+    # Bind before any other init so the port answers immediately on cold start
+    server = GameServer(('0.0.0.0', port), GameHandler)
+    server_ready.set()
 
-    # Start background refresh thread
+    # Initial cache load and periodic refresh happen off the serving thread
     thread = threading.Thread(target=cache_refresh_thread, daemon=True)
     thread.start()
 
-    # Start server
-    server = HTTPServer(('0.0.0.0', PORT), GameHandler)
-    print(f'\nServer running at http://localhost:{PORT}')
+    print(f'\nServer running at http://localhost:{port}')
     print('Press Ctrl+C to stop\n')
 
     try:
@@ -766,3 +686,7 @@ if __name__ == '__main__':
     except KeyboardInterrupt:
         print('\nShutting down...')
         server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
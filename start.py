@@ -5,9 +5,6 @@ Run this to start the game and get the URL for phone access.
 """
 
 import socket
-import subprocess
-import sys
-import os
 
 def get_local_ip():
     """Get the local IP address for network access."""
@@ -27,8 +24,11 @@ def main():
     print("=" * 60)
     print()
 
+    # Run the server in this process rather than paying for a second interpreter
+    import server
+
     local_ip = get_local_ip()
-    port = 3000
+    port = server.PORT  # PORT env var, default 3000
 
     print("Access the game at:")
     print()
@@ -43,9 +43,7 @@ def main():
     print("=" * 60)
     print()
 
-    # Start the server
-    server_path = os.path.join(os.path.dirname(__file__), 'server.py')
-    subprocess.run([sys.executable, server_path])
+    server.main(port)
 
 if __name__ == '__main__':
     main()
@@ -4,16 +4,15 @@ Car Guess Game - Public Access Launcher
 Creates a public URL so you can play from anywhere!
 """
 
-import subprocess
 import sys
-import os
 import time
 import threading
 
+import server
+
 def start_server():
     """Start the game server."""
-    server_path = os.path.join(os.path.dirname(__file__), 'server.py')
-    subprocess.run([sys.executable, server_path])
+    server.main(3000)
 
 def main():
     print("=" * 60)
@@ -26,8 +25,8 @@ def main():
     server_thread = threading.Thread(target=start_server, daemon=True)
     server_thread.start()
 
-    # Wait for server to start
-    time.sleep(3)
+    # Wait for server to bind its port
+    server.server_ready.wait(timeout=10)
 
     # Start ngrok
     try:
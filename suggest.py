@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Car Guess Game - Typeahead Suggestions
+Prefix indexes over make and model names, rebuilt on every refresh.
+
+Names are keyed by their normalized form (lowercase alphanumerics, the same
+rule as the facet filters) and by each word suffix, so "merc" finds
+Mercedes-Benz and "carrera" finds "911 Carrera". Keys live in sorted lists
+(makes, all models, models per make) and a prefix is a bisect range;
+matches are ranked by how many cached cars use the name, and hot queries
+are served from an LRU.
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+
+from car_index import facet_key
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+
+# Prefixes matching more keys than this get their top names precomputed
+HEAVY_RANGE = 512
+
+# Sorts after every normalized character, closing a prefix range
+PREFIX_END = '\x7f'
+
+
+def word_keys(name):
+    """Normalized keys for a name and each of its word suffixes."""
+    words = name.split()
+    keys = (re.sub(r'[^a-z0-9]', '', ' '.join(words[i:]).lower()) for i in range(len(words)))
+    return tuple(key for key in keys if key)
+
+
+class PrefixIndex:
+    """Sorted word-suffix keys for bisect prefix lookups.
+
+    Names are ranked by count up front, so a prefix's best matches are the
+    smallest ranks in its key range. Ranges too big to rank per query (one
+    or two letters) have their top names precomputed.
+    """
+
+    def __init__(self, counts, name_keys=None):
+        """
+        Args:
+            counts: Mapping of display name -> number of cars using it
+            name_keys: Dict cache of name -> keys, shared between indexes
+        """
+        self.counts = counts
+        self.top = sorted(counts, key=lambda name: (-counts[name], name))
+        rank = {name: i for i, name in enumerate(self.top)}
+
+        if name_keys is None:
+            name_keys = {}
+        pairs = set()
+        for name in counts:
+            keys = name_keys.get(name)
+            if keys is None:
+                keys = name_keys[name] = word_keys(name)
+            pairs.update((key, rank[name]) for key in keys)
+        pairs = sorted(pairs)
+        self.keys = [key for key, _ in pairs]
+        self.ranks = array('I', (r for _, r in pairs))
+
+        # Any range longer than HEAVY_RANGE contains a key at a multiple of
+        # HEAVY_RANGE, so checking the prefixes of those keys finds them all
+        self.heavy = {}
+        for pos in range(0, len(self.keys), HEAVY_RANGE):
+            key = self.keys[pos]
+            for end in range(1, len(key) + 1):
+                prefix = key[:end]
+                if prefix in self.heavy:
+                    continue
+                lo, hi = self.key_range(prefix)
+                if hi - lo <= HEAVY_RANGE:
+                    break
+                self.heavy[prefix] = self.top_ranks(lo, hi)
+
+    def key_range(self, prefix):
+        lo = bisect_left(self.keys, prefix)
+        return lo, bisect_left(self.keys, prefix + PREFIX_END, lo)
+
+    def top_ranks(self, lo, hi, limit=MAX_LIMIT):
+        return sorted(set(self.ranks[lo:hi]))[:limit]
+
+    def search(self, prefix, limit):
+        """Most common names with a word starting with prefix."""
+        if not prefix:
+            return self.top[:limit]
+
+        ranks = self.heavy.get(prefix)
+        if ranks is None:
+            ranks = self.top_ranks(*self.key_range(prefix), limit)
+        return [self.top[r] for r in ranks[:limit]]
+
+
+class SuggestIndex:
+    """Make and model suggestions over one snapshot of the car list."""
+
+    def __init__(self, cars, known_makes=()):
+        make_counts = Counter({make: 0 for make in known_makes})
+        model_counts = Counter()
+        models_by_make = {}
+        for car in cars:
+            make_counts[car['make']] += 1
+            model_counts[car['model']] += 1
+            models_by_make.setdefault(facet_key(car['make']), Counter())[car['model']] += 1
+
+        name_keys = {}
+        self.makes = PrefixIndex(make_counts, name_keys)
+        self.models = PrefixIndex(model_counts, name_keys)
+        self.models_by_make = {key: PrefixIndex(counts, name_keys)
+                               for key, counts in models_by_make.items()}
+        self.suggest = lru_cache(maxsize=4096)(self._suggest)
+
+    def _suggest(self, field, query, make='', limit=DEFAULT_LIMIT):
+        """Ranked suggestions as [{'value', 'count'}].
+
+        Args:
+            field: 'make' or 'model'
+            query: What the player has typed so far
+            make: For models, the make already entered (narrows results)
+        """
+        prefix = facet_key(query)
+        if field == 'make':
+            index = self.makes
+        else:
+            index = self.models_by_make.get(facet_key(make), self.models) if make else self.models
+        return tuple({'value': name, 'count': index.counts[name]}
+                     for name in index.search(prefix, max(1, min(limit, MAX_LIMIT))))